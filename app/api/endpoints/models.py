@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from app.ml.model_manager import sentiment_model_manager
+from app.ml.sentiment_cache import get_sentiment_cache
+from app.ml.inference_service import sentiment_inference_service
+from app.ml.cascade import cascade_stats
+from app.ml import resources
+from app.ml.summary_cache import summary_cache
+from app.ml.stemming import cached_stemmer
+from app.scraper.resource_blocking import resource_usage_stats
+from app.core.config import SENTIMENT_CACHE_ENABLED, SENTIMENT_CASCADE_ENABLED
+
+router = APIRouter()
+
+@router.get("/models/status")
+def models_status():
+    """
+    Report load time and memory footprint of the shared ML models.
+    """
+    return {
+        "status": "success",
+        "sentiment": sentiment_model_manager.stats(),
+        "sentiment_cache": get_sentiment_cache().stats() if SENTIMENT_CACHE_ENABLED else None,
+        "sentiment_service": sentiment_inference_service.stats(),
+        "sentiment_cascade": cascade_stats.stats() if SENTIMENT_CASCADE_ENABLED else None,
+        "summary_resources": resources.stats(),
+        "summary_cache": summary_cache.stats(),
+        "stem_cache": cached_stemmer.stats(),
+        "scraper_resources": resource_usage_stats.stats()
+    }
+
+@router.get("/models/resources")
+def models_resources():
+    """
+    Check which summarization and keyword resources are available locally, without loading them.
+    """
+    return {"status": "success", "resources": resources.check_resources()}
@@ -1,30 +1,95 @@
+from typing import List
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_validator
-from app.scraper.gmaps_scraper import scrape_gmaps_reviews
-from app.ml.sentiment_analysis import process_reviews_json
+from app.scraper.gmaps_scraper import iter_gmaps_reviews
+from app.scraper.browser_pool import BrowserPool
+from app.scraper.batch_scheduler import BatchScrapeScheduler
+from app.ml.sentiment_analysis import classify_review_stream, save_sentiment_results
+from app.ml.inference_service import sentiment_inference_service
+from app.core.config import (
+    BROWSER_POOL_SIZE, BROWSER_POOL_MAX_PAGES, BROWSER_POOL_IDLE_TIMEOUT, BROWSER_CAPTURE_NETWORK,
+    SCRAPER_EXTRACTION_MODE, SAVE_SCRAPED_REVIEWS, DATA_DIR,
+    BATCH_SCRAPE_CONCURRENCY, BATCH_HOST_MIN_INTERVAL, BATCH_MAX_RETRIES, BATCH_RETRY_BACKOFF
+)
 import asyncio
+import json
 
 router = APIRouter()
 
+# Shared warm browsers; started and closed by the app's startup/shutdown hooks
+browser_pool = BrowserPool(
+    size=BROWSER_POOL_SIZE,
+    max_pages_per_driver=BROWSER_POOL_MAX_PAGES,
+    idle_timeout=BROWSER_POOL_IDLE_TIMEOUT,
+    capture_network=BROWSER_CAPTURE_NETWORK
+)
+
+batch_scheduler = BatchScrapeScheduler(
+    browser_pool,
+    concurrency=BATCH_SCRAPE_CONCURRENCY,
+    host_min_interval=BATCH_HOST_MIN_INTERVAL,
+    max_retries=BATCH_MAX_RETRIES,
+    retry_backoff=BATCH_RETRY_BACKOFF
+)
+
+def validate_place_url(v):
+    allowed_prefixes = [
+        "https://www.google.com/maps/place/",
+        "https://maps.app.goo.gl/"
+    ]
+    if not any(v.startswith(prefix) for prefix in allowed_prefixes):
+        raise ValueError("URL must start with 'https://www.google.com/maps/place/' or 'https://maps.app.goo.gl/'")
+    return v
+
 class ScrapeURL(BaseModel):
     url: str
+    # Only collect reviews newer than the previous scrape of this place
+    delta: bool = False
 
     @field_validator("url")
     @classmethod
     def validate_url(cls, v):
-        allowed_prefixes = [
-            "https://www.google.com/maps/place/",
-            "https://maps.app.goo.gl/"
-        ]
-        if not any(v.startswith(prefix) for prefix in allowed_prefixes):
-            raise ValueError("URL must start with 'https://www.google.com/maps/place/' or 'https://maps.app.goo.gl/'")
-        return v
+        return validate_place_url(v)
+
+class BatchScrapeURLs(BaseModel):
+    urls: List[str]
+    num_reviews: int = 10
+    delta: bool = False
+
+    @field_validator("urls")
+    @classmethod
+    def validate_urls(cls, v):
+        if not v:
+            raise ValueError("At least one URL is required")
+        return [validate_place_url(url) for url in v]
     
-def run_scraping_and_sentiment(url: str):
-    scrape_gmaps_reviews(url)
+def run_scraping_and_sentiment(url: str, delta: bool = False):
+    # Reviews are classified while the scraper is still scrolling. The delta record and raw
+    # review file are only written once the sentiment results are saved, so a failure in
+    # between does not mark unclassified reviews as seen
+    scrape_writes = []
+    scrape_info = {}
+    reviews = iter_gmaps_reviews(
+        url,
+        browser_pool=browser_pool,
+        delta=delta,
+        extraction_mode=SCRAPER_EXTRACTION_MODE,
+        output_file=DATA_DIR if SAVE_SCRAPED_REVIEWS else None,
+        deferred_writes=scrape_writes,
+        scrape_info=scrape_info
+    )
+    # Share forward passes with concurrent scrapes when the batching service is running
+    classify = sentiment_inference_service.classify_threadsafe if sentiment_inference_service.is_running() else None
+    sentiment_results = list(classify_review_stream(reviews, classify=classify))
+    if not sentiment_results:
+        # Nothing (new) was scraped, so keep the previous results on disk
+        return [], scrape_info.get("resource_report")
 
-    sentiment_results = process_reviews_json()
-    return sentiment_results
+    save_sentiment_results(sentiment_results)
+    for write in scrape_writes:
+        write()
+    return sentiment_results, scrape_info.get("resource_report")
 
 @router.post("/scrape")
 async def scrape_and_analyze(url: ScrapeURL):
@@ -34,8 +99,23 @@ async def scrape_and_analyze(url: ScrapeURL):
     """
     try:
         loop = asyncio.get_running_loop()
-        sentiment_results = await loop.run_in_executor(None, run_scraping_and_sentiment, url.url)
+        sentiment_results, resource_report = await loop.run_in_executor(None, run_scraping_and_sentiment,
+                                                                        url.url, url.delta)
         return {"status": "success", 
-                "message": "Scraping dan sentiment analysis selesai.","sentiment_results": sentiment_results[:3]}
+                "message": "Scraping dan sentiment analysis selesai.","sentiment_results": sentiment_results[:3],
+                "resource_report": resource_report}
     except Exception as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+@router.post("/scrape/batch")
+async def scrape_batch(batch: BatchScrapeURLs):
+    """
+    Scrape reviews for many places across the browser pool.
+    Hasil per tempat dikirim sebagai NDJSON (satu baris JSON per tempat) segera setelah selesai.
+    """
+    async def results():
+        async for result in batch_scheduler.run(batch.urls, num_reviews=batch.num_reviews, delta=batch.delta,
+                                                  extraction_mode=SCRAPER_EXTRACTION_MODE):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
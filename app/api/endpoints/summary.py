@@ -1,31 +1,49 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Request, Response
 from app.ml.final_result import main_result
-from app.core.config import SUMMARY_JSON_DIR
-import json
-import os
-import asyncio
+from app.ml.decoding import DECODING_PROFILES
+from app.ml.summary_cache import summary_cache, summary_settings
+from app.core.config import SENTIMENT_JSON_FILE, SUMMARY_DEFAULT_PROFILE
+import threading
 
 router = APIRouter()
 
+# One summary computation at a time; concurrent requests for the same inputs then hit the cache
+_compute_lock = threading.Lock()
+
 @router.get("/summary-results")
-def reviews_summary():
+def reviews_summary(request: Request, response: Response,
+                    profile: Optional[str] = None, max_latency: Optional[float] = None):
+    """
+    Keywords and summaries per sentiment.
+    profile memilih decoding profile (fast, balanced, quality); max_latency (detik) memilih
+    profile terberat yang diperkirakan selesai dalam batas waktu tersebut.
+    Hasil di-cache berdasarkan fingerprint review + label + pengaturan decoding, dan
+    dikirim dengan ETag sehingga client bisa memakai If-None-Match.
+    """
     try:
-        if not os.path.exists(SUMMARY_JSON_DIR):
-            main_result()
-        
+        if profile is not None and profile not in DECODING_PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of: {', '.join(DECODING_PROFILES)}")
+        if max_latency is not None:
+            # The budget picks the profile
+            profile = None
+        else:
+            profile = profile or SUMMARY_DEFAULT_PROFILE
+
+        fingerprint = summary_cache.fingerprint(SENTIMENT_JSON_FILE, summary_settings(profile, max_latency))
+        etag = f'"{fingerprint}"'
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers={"ETag": etag})
 
-        with open(SUMMARY_JSON_DIR, "r", encoding="utf-8") as f:
-            try:
-                summary_results = json.load(f)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Error decoding JSON file: {e}")
-            
-        # try:
-        #     os.remove(SUMMARY_JSON_DIR)
-        #     print(f"{SUMMARY_JSON_DIR} deleted after reading")
-        # except Exception as e:
-        #     print(f"Error deleting {SUMMARY_JSON_DIR}: {e}")
+        summary_results = summary_cache.get(fingerprint)
+        if summary_results is None:
+            with _compute_lock:
+                summary_results = summary_cache.get(fingerprint)
+                if summary_results is None:
+                    summary_results = main_result(profile=profile, max_latency=max_latency)
+                    summary_cache.put(fingerprint, summary_results)
 
+        response.headers["ETag"] = etag
         return {
             "status": "success",
             "message": "Summary results loaded successfully.",
@@ -35,4 +53,4 @@ def reviews_summary():
         return {
             "status": "error",
             "message": str(e)
-        }
\ No newline at end of file
+        }
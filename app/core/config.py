@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -9,3 +10,111 @@ SENTIMENT_JSON_FILE = BASE_DIR / "data" / "google_maps_reviews_with_sentiment.js
 PRETRAINED_MODEL = "indolem/indobert-base-uncased"
 DATA_DIR = BASE_DIR / "data"
 
+# Warm Chrome pool shared by the scraping endpoints
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_POOL_MAX_PAGES = int(os.getenv("BROWSER_POOL_MAX_PAGES", "20"))
+BROWSER_POOL_IDLE_TIMEOUT = float(os.getenv("BROWSER_POOL_IDLE_TIMEOUT", "600"))
+BROWSER_POOL_LEASE_TIMEOUT = float(os.getenv("BROWSER_POOL_LEASE_TIMEOUT", "300"))
+# Enable DevTools network capture on pooled browsers so extraction_mode="network" works
+BROWSER_CAPTURE_NETWORK = os.getenv("BROWSER_CAPTURE_NETWORK", "0") == "1"
+# Review extraction mode used by the API: "page", "element" or "network"
+SCRAPER_EXTRACTION_MODE = os.getenv("SCRAPER_EXTRACTION_MODE", "page")
+# Resource blocking profile for scraper sessions: "review_text", "tiles" or "none"
+SCRAPER_BLOCK_PROFILE = os.getenv("SCRAPER_BLOCK_PROFILE", "review_text")
+
+# Per-place record of already scraped reviews, used for delta scraping
+SEEN_REVIEWS_DIR = DATA_DIR / "seen_reviews"
+
+# Batch scraping scheduler
+BATCH_SCRAPE_CONCURRENCY = int(os.getenv("BATCH_SCRAPE_CONCURRENCY", str(BROWSER_POOL_SIZE)))
+BATCH_HOST_MIN_INTERVAL = float(os.getenv("BATCH_HOST_MIN_INTERVAL", "2"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "2"))
+BATCH_RETRY_BACKOFF = float(os.getenv("BATCH_RETRY_BACKOFF", "5"))
+
+# Learned hit rates of the scraper's fallback selectors
+SELECTOR_STATS_FILE = DATA_DIR / "selector_stats.json"
+# Weight kept by old outcomes on each new one, and the share of lookups that use the
+# default order so a demoted selector is tried again and can recover
+SELECTOR_STATS_DECAY = float(os.getenv("SELECTOR_STATS_DECAY", "0.95"))
+SELECTOR_EXPLORE_RATE = float(os.getenv("SELECTOR_EXPLORE_RATE", "0.1"))
+
+# Sentiment inference backend: "torch" or "onnx" (ONNX Runtime, export with app.ml.onnx_export)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+SENTIMENT_ONNX_PATH = BASE_DIR / "ml_models" / "model.onnx"
+
+# Run the sentiment model with int8 dynamic quantization (CPU only)
+SENTIMENT_QUANTIZE = os.getenv("SENTIMENT_QUANTIZE", "0") == "1"
+
+# Batched sentiment inference
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "16"))
+# Batch reviews of similar length together to minimise padding
+SENTIMENT_SORT_BY_LENGTH = os.getenv("SENTIMENT_SORT_BY_LENGTH", "1") == "1"
+
+# Streaming scrape -> sentiment pipeline
+SENTIMENT_STREAM_BATCH_SIZE = int(os.getenv("SENTIMENT_STREAM_BATCH_SIZE", "8"))
+# Scraped reviews allowed to wait for classification before the scraper is paused
+SENTIMENT_PREFETCH_MAX_PENDING = int(os.getenv("SENTIMENT_PREFETCH_MAX_PENDING", "64"))
+# Also write the raw scraped reviews to JSON_FILE (only needed by process_reviews_json)
+SAVE_SCRAPED_REVIEWS = os.getenv("SAVE_SCRAPED_REVIEWS", "1") == "1"
+
+# Load the sentiment model in the background at start-up instead of on the first request
+SENTIMENT_PRELOAD = os.getenv("SENTIMENT_PRELOAD", "1") == "1"
+
+# Content-addressed cache of sentiment predictions
+SENTIMENT_CACHE_ENABLED = os.getenv("SENTIMENT_CACHE_ENABLED", "1") == "1"
+SENTIMENT_CACHE_FILE = DATA_DIR / "sentiment_cache.sqlite3"
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "200000"))
+
+# Sharded sentiment inference for bulk backfills: worker processes (0 disables) and
+# torch threads per worker (0 splits the CPU cores evenly between workers)
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
+SENTIMENT_WORKER_THREADS = int(os.getenv("SENTIMENT_WORKER_THREADS", "0"))
+
+# Reviews read, classified and written per step when processing a JSON file
+SENTIMENT_JSON_CHUNK_SIZE = int(os.getenv("SENTIMENT_JSON_CHUNK_SIZE", "1024"))
+
+# Shared micro-batching queue for sentiment inference across concurrent requests:
+# a batch is run once it holds MAX_BATCH reviews or its first request waited MAX_WAIT_MS
+SENTIMENT_SERVICE_ENABLED = os.getenv("SENTIMENT_SERVICE_ENABLED", "1") == "1"
+SENTIMENT_SERVICE_MAX_BATCH = int(os.getenv("SENTIMENT_SERVICE_MAX_BATCH", "32"))
+SENTIMENT_SERVICE_MAX_WAIT_MS = float(os.getenv("SENTIMENT_SERVICE_MAX_WAIT_MS", "10"))
+# Seconds a scrape thread waits for its labels before giving up
+SENTIMENT_SERVICE_TIMEOUT = float(os.getenv("SENTIMENT_SERVICE_TIMEOUT", "300"))
+
+# Cascade mode: a cheap first-stage model (train with app.ml.cascade) labels confident
+# reviews and only the rest go to IndoBERT. THRESHOLD 0 uses the threshold calibrated
+# at training time; AUDIT_RATE of the confident reviews are also sent to IndoBERT to
+# track agreement.
+SENTIMENT_CASCADE_ENABLED = os.getenv("SENTIMENT_CASCADE_ENABLED", "0") == "1"
+SENTIMENT_CASCADE_MODEL = BASE_DIR / "ml_models" / "cascade_first_stage.json"
+SENTIMENT_CASCADE_THRESHOLD = float(os.getenv("SENTIMENT_CASCADE_THRESHOLD", "0"))
+SENTIMENT_CASCADE_AUDIT_RATE = float(os.getenv("SENTIMENT_CASCADE_AUDIT_RATE", "0.05"))
+
+# Summarization and keyword resources are loaded on first use; SUMMARY_PRELOAD=1
+# warms them up in the background at start-up. NLTK_AUTO_DOWNLOAD=0 never touches
+# the network and fails if NLTK data is missing.
+SUMMARY_MODEL_NAME = os.getenv("SUMMARY_MODEL_NAME", "cahya/t5-base-indonesian-summarization-cased")
+SUMMARY_PRELOAD = os.getenv("SUMMARY_PRELOAD", "0") == "1"
+NLTK_AUTO_DOWNLOAD = os.getenv("NLTK_AUTO_DOWNLOAD", "1") == "1"
+
+# Map-reduce summarization: reviews are packed into chunks of at most CHUNK_TOKENS
+# tokens (T5's input window is 512; the rest is slack for separators), summarized in
+# batches, and the partial
+# summaries are merged FAN_IN at a time for up to MAX_DEPTH levels
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "480"))
+SUMMARY_PARTIAL_MAX_TOKENS = int(os.getenv("SUMMARY_PARTIAL_MAX_TOKENS", "96"))
+SUMMARY_FAN_IN = int(os.getenv("SUMMARY_FAN_IN", "4"))
+SUMMARY_MAX_DEPTH = int(os.getenv("SUMMARY_MAX_DEPTH", "3"))
+SUMMARY_GENERATE_BATCH_SIZE = int(os.getenv("SUMMARY_GENERATE_BATCH_SIZE", "8"))
+
+# Decoding profile used when a summary request does not name one (fast, balanced,
+# quality) and where measured generation speed per profile is kept
+SUMMARY_DEFAULT_PROFILE = os.getenv("SUMMARY_DEFAULT_PROFILE", "balanced")
+SUMMARY_TIMINGS_FILE = DATA_DIR / "summary_timings.json"
+
+# Summaries cached by a fingerprint of the sentiment-labelled reviews and settings
+SUMMARY_CACHE_DIR = DATA_DIR / "summary_cache"
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "32"))
+
+# Persistent token -> stem map for keyword extraction
+STEM_CACHE_FILE = DATA_DIR / "stem_cache.json"
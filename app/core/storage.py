@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+
+
+def open_temp_file(path):
+    """
+    Create a temp file next to `path` and return it opened for writing, with its path.
+
+    Every call gets its own file, so two writers saving the same path at once never
+    truncate each other's output; whichever os.replace runs last wins.
+    """
+    path = str(path)
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix='.tmp')
+    # mkstemp makes the file private to the owner; keep the usual permissions instead
+    os.chmod(tmp_path, 0o644)
+    return os.fdopen(fd, 'w', encoding='utf-8'), tmp_path
+
+
+def remove_temp_file(tmp_path):
+    try:
+        os.remove(tmp_path)
+    except OSError:
+        pass
+
+
+def save_json_atomic(path, data, **dump_kwargs):
+    """
+    Write `data` as JSON to `path`, creating its directory if needed.
+
+    The JSON goes to a temp file that then replaces `path`, so a crash or a
+    concurrent reader never sees a truncated file.
+    """
+    f, tmp_path = open_temp_file(path)
+    try:
+        with f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, str(path))
+    except BaseException:
+        remove_temp_file(tmp_path)
+        raise
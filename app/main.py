@@ -1,7 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import scraping, summary, food_filter
+from app.api.endpoints import scraping, summary, food_filter, models
 from app.ml.model_downloader import ensure_model_downloaded
+from app.ml.model_manager import sentiment_model_manager
+from app.ml.inference_service import sentiment_inference_service
+from app.ml import resources
+from app.core.config import SENTIMENT_PRELOAD, SENTIMENT_SERVICE_ENABLED, SUMMARY_PRELOAD
+import threading
 
 app = FastAPI()
 
@@ -19,6 +24,39 @@ app.add_middleware(
 
 ensure_model_downloaded()
 
+@app.on_event("startup")
+def start_browser_pool():
+    scraping.browser_pool.start()
+
+@app.on_event("startup")
+def preload_sentiment_model():
+    if SENTIMENT_PRELOAD:
+        sentiment_model_manager.load_in_background()
+
+@app.on_event("startup")
+def check_summary_resources():
+    # Offline check only; the summarizer itself loads on the first summary request
+    report = resources.check_resources()
+    if not report['ready']:
+        missing = [name for name, entry in report.items() if name != 'ready' and not entry['available']]
+        print(f"Summary resources not available locally yet: {', '.join(missing)}")
+    if SUMMARY_PRELOAD:
+        threading.Thread(target=resources.warm_up, name="summary-warmup", daemon=True).start()
+
+@app.on_event("startup")
+async def start_sentiment_service():
+    if SENTIMENT_SERVICE_ENABLED:
+        sentiment_inference_service.start()
+
+@app.on_event("shutdown")
+def close_browser_pool():
+    scraping.browser_pool.close()
+
+@app.on_event("shutdown")
+async def close_sentiment_service():
+    await sentiment_inference_service.close()
+
 app.include_router(scraping.router, prefix="/api")
 app.include_router(summary.router, prefix="/api")
-app.include_router(food_filter.router, prefix="/api")
\ No newline at end of file
+app.include_router(food_filter.router, prefix="/api")
+app.include_router(models.router, prefix="/api")
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Cheap first-stage sentiment model for the cascade mode.
+
+A multinomial Naive Bayes over word unigrams/bigrams and the star rating, trained
+on labels produced by the IndoBERT model. In cascade mode it labels the reviews it
+is confident about and only the rest go to IndoBERT.
+
+Usage:
+    python -m app.ml.cascade --sample data/google_maps_reviews_with_sentiment.json
+    python -m app.ml.cascade --target-agreement 0.97 --holdout 0.2
+
+Training holds out part of the sample, picks the lowest confidence threshold whose
+first-stage labels agree with IndoBERT on at least --target-agreement of the reviews
+it accepts, reports the routed fraction and agreement, and saves the model.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+from collections import Counter
+from app.core.config import SENTIMENT_CASCADE_MODEL, SENTIMENT_JSON_FILE
+from app.core.storage import save_json_atomic
+from app.ml.review_io import iter_review_records
+
+LABELS = ("negative", "neutral", "positive")
+
+
+def tokenize(text, rating=None):
+    """Lowercased word unigrams and bigrams, plus a token for the star rating if known"""
+    words = re.findall(r"[a-z0-9]+", str(text).lower())
+    tokens = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    if rating:
+        tokens.append(f"__rating_{int(round(float(rating)))}")
+    return tokens
+
+
+class FirstStageModel:
+    """Naive Bayes text classifier with a per-review confidence"""
+
+    def __init__(self, class_counts, token_counts, threshold=0.9, alpha=1.0):
+        self.class_counts = class_counts
+        self.token_counts = token_counts
+        self.threshold = threshold
+        self.alpha = alpha
+        self._prepare()
+
+    def _prepare(self):
+        total = sum(self.class_counts.values())
+        vocab = set()
+        for counts in self.token_counts.values():
+            vocab.update(counts)
+        self._log_prior = {
+            label: math.log((self.class_counts.get(label, 0) + self.alpha) / (total + self.alpha * len(LABELS)))
+            for label in LABELS
+        }
+        self._log_likelihood = {}
+        self._log_unseen = {}
+        for label in LABELS:
+            counts = self.token_counts.get(label, {})
+            denominator = sum(counts.values()) + self.alpha * len(vocab)
+            self._log_likelihood[label] = {
+                token: math.log((count + self.alpha) / denominator) for token, count in counts.items()
+            }
+            self._log_unseen[label] = math.log(self.alpha / denominator)
+        self._vocab = vocab
+
+    @classmethod
+    def train(cls, texts, labels, ratings=None, **kwargs):
+        ratings = ratings or [None] * len(texts)
+        class_counts = Counter()
+        token_counts = {label: Counter() for label in LABELS}
+        for text, label, rating in zip(texts, labels, ratings):
+            if label not in token_counts:
+                continue
+            class_counts[label] += 1
+            token_counts[label].update(tokenize(text, rating))
+        return cls(dict(class_counts), {label: dict(counts) for label, counts in token_counts.items()}, **kwargs)
+
+    def predict_one(self, text, rating=None):
+        """Return (label, confidence) for one review"""
+        tokens = [token for token in tokenize(text, rating) if token in self._vocab]
+        if not tokens:
+            return None, 0.0
+        scores = {}
+        for label in LABELS:
+            likelihood = self._log_likelihood[label]
+            unseen = self._log_unseen[label]
+            # Averaged over tokens so long reviews are not pushed to near-certain probabilities
+            scores[label] = self._log_prior[label] + sum(likelihood.get(t, unseen) for t in tokens) / len(tokens)
+        best = max(scores, key=scores.get)
+        norm = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / norm
+
+    def predict(self, texts, ratings=None):
+        ratings = ratings or [None] * len(texts)
+        return [self.predict_one(text, rating) for text, rating in zip(texts, ratings)]
+
+    def save(self, path=SENTIMENT_CASCADE_MODEL):
+        save_json_atomic(path, {
+            "threshold": self.threshold,
+            "alpha": self.alpha,
+            "class_counts": self.class_counts,
+            "token_counts": self.token_counts
+        })
+
+    @classmethod
+    def load(cls, path=SENTIMENT_CASCADE_MODEL):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data["class_counts"], data["token_counts"], threshold=data["threshold"], alpha=data["alpha"])
+
+
+class CascadeStats:
+    """Counts of reviews routed to each stage, and first-stage agreement on audited reviews"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.first_stage = 0
+        self.fallback = 0
+        self.audited = 0
+        self.audit_agreed = 0
+
+    def record(self, first_stage, fallback, audited=0, audit_agreed=0):
+        with self._lock:
+            self.first_stage += first_stage
+            self.fallback += fallback
+            self.audited += audited
+            self.audit_agreed += audit_agreed
+
+    def stats(self):
+        total = self.first_stage + self.fallback
+        return {
+            "reviews": total,
+            "first_stage_fraction": self.first_stage / total if total else None,
+            "fallback_fraction": self.fallback / total if total else None,
+            "audited": self.audited,
+            "agreement": self.audit_agreed / self.audited if self.audited else None
+        }
+
+
+cascade_stats = CascadeStats()
+
+_model_lock = threading.Lock()
+_model = None
+_model_loaded = False
+
+
+def get_first_stage_model():
+    """The trained first-stage model, or None if it has not been trained yet"""
+    global _model, _model_loaded
+    with _model_lock:
+        if not _model_loaded:
+            _model_loaded = True
+            try:
+                _model = FirstStageModel.load(SENTIMENT_CASCADE_MODEL)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Cascade first stage unavailable ({e}), train it with python -m app.ml.cascade")
+        return _model
+
+
+def evaluate(model, texts, labels, ratings, threshold):
+    """Fraction of reviews the first stage accepts at `threshold` and its agreement with `labels` on them"""
+    accepted = agreed = 0
+    for (label, confidence), reference in zip(model.predict(texts, ratings), labels):
+        if label is not None and confidence >= threshold:
+            accepted += 1
+            agreed += label == reference
+    return {
+        "threshold": threshold,
+        "first_stage_fraction": accepted / len(texts) if texts else None,
+        "agreement": agreed / accepted if accepted else None
+    }
+
+
+def calibrate_threshold(model, texts, labels, ratings, target_agreement):
+    """Lowest confidence threshold at which accepted reviews agree with `labels` at least target_agreement"""
+    scored = sorted(
+        ((confidence, label == reference) for (label, confidence), reference
+         in zip(model.predict(texts, ratings), labels) if label is not None),
+        reverse=True
+    )
+    threshold = 1.0
+    agreed = 0
+    for accepted, (confidence, agrees) in enumerate(scored, start=1):
+        agreed += agrees
+        if agreed / accepted >= target_agreement:
+            threshold = confidence
+    return threshold
+
+
+def load_labelled(path):
+    texts, labels, ratings = [], [], []
+    for _, text, item in iter_review_records(path):
+        if not isinstance(item, dict) or item.get('sentiment') not in LABELS or not text or not str(text).strip():
+            continue
+        texts.append(str(text))
+        labels.append(item['sentiment'])
+        ratings.append(item.get('rating'))
+    return texts, labels, ratings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the cascade first-stage model on IndoBERT labels")
+    parser.add_argument("--sample", default=str(SENTIMENT_JSON_FILE), help="JSON file of reviews labelled by IndoBERT")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for calibration")
+    parser.add_argument("--target-agreement", type=float, default=0.97,
+                        help="Required agreement with IndoBERT on reviews the first stage accepts")
+    parser.add_argument("--output", default=str(SENTIMENT_CASCADE_MODEL))
+    args = parser.parse_args()
+
+    texts, labels, ratings = load_labelled(args.sample)
+    order = list(range(len(texts)))
+    random.Random(0).shuffle(order)
+    split = int(len(order) * (1 - args.holdout))
+    train_idx, holdout_idx = order[:split], order[split:]
+    if not train_idx or not holdout_idx:
+        parser.error(f"Need more labelled reviews than {len(texts)} to train and calibrate")
+
+    def pick(values, indices):
+        return [values[i] for i in indices]
+
+    model = FirstStageModel.train(pick(texts, train_idx), pick(labels, train_idx), pick(ratings, train_idx))
+    holdout = pick(texts, holdout_idx), pick(labels, holdout_idx), pick(ratings, holdout_idx)
+    model.threshold = calibrate_threshold(model, *holdout, args.target_agreement)
+
+    report = evaluate(model, *holdout, model.threshold)
+    report.update({"train_reviews": len(train_idx), "holdout_reviews": len(holdout_idx)})
+    print(json.dumps(report, indent=2))
+
+    model.save(args.output)
+    print(f"Saved first-stage model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Compare a sentiment model variant against the fp32 reference on a labelled sample.
+
+Usage:
+    python -m app.ml.compare_models --candidate int8
+    python -m app.ml.compare_models --candidate int8 --sample data/labelled.json --limit 500
+    python -m app.ml.compare_models --candidate onnx
+
+The sample is a JSON list of review records with a 'sentiment' label (the output of
+process_reviews_json works). The report covers accuracy against those labels,
+agreement between the two models, latency and serialized model size.
+"""
+import argparse
+import io
+import json
+import os
+import time
+import torch
+from transformers import AutoTokenizer
+from app.core.config import MODEL_PATH, PRETRAINED_MODEL, SENTIMENT_JSON_FILE, SENTIMENT_ONNX_PATH
+from app.ml.sentiment_analysis import (
+    load_sentiment_model, classify_reviews_batch, OnnxSentimentModel
+)
+from app.ml.review_io import iter_review_records
+
+
+def load_sample(path, limit=None):
+    """Return (texts, labels) from a JSON file of reviews; labels are None when missing"""
+    texts, labels = [], []
+    for _, text, item in iter_review_records(path):
+        if text is None or not str(text).strip():
+            continue
+        texts.append(str(text))
+        labels.append(item.get('sentiment') if isinstance(item, dict) else None)
+        if limit and len(texts) >= limit:
+            break
+    return texts, labels
+
+
+def serialized_size(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def torch_variant(quantize):
+    """Build a predict(texts) function for the torch model, fp32 or int8"""
+    device = torch.device('cpu')
+    tokenizer = AutoTokenizer.from_pretrained(PRETRAINED_MODEL)
+    model = load_sentiment_model(MODEL_PATH, device, model_name=PRETRAINED_MODEL, num_labels=3, quantize=quantize)
+
+    def predict(texts):
+        return classify_reviews_batch(texts, model, tokenizer, device)
+
+    return predict, serialized_size(model)
+
+
+def onnx_variant(onnx_path=SENTIMENT_ONNX_PATH):
+    """Build a predict(texts) function for the onnxruntime backend"""
+    device = torch.device('cpu')
+    tokenizer = AutoTokenizer.from_pretrained(PRETRAINED_MODEL)
+    model = OnnxSentimentModel(onnx_path)
+
+    def predict(texts):
+        return classify_reviews_batch(texts, model, tokenizer, device)
+
+    return predict, os.path.getsize(onnx_path)
+
+
+# Candidate name -> factory returning (predict, size_bytes)
+CANDIDATES = {
+    "int8": lambda **kwargs: torch_variant(quantize=True),
+    "onnx": lambda onnx_path=SENTIMENT_ONNX_PATH: onnx_variant(onnx_path),
+}
+
+
+def run(predict, texts, repeats):
+    predict(texts[:8])  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predictions = predict(texts)
+    return predictions, (time.perf_counter() - start) / repeats
+
+
+def accuracy(predictions, labels):
+    pairs = [(p, l) for p, l in zip(predictions, labels) if l is not None]
+    if not pairs:
+        return None
+    return sum(p == l for p, l in pairs) / len(pairs)
+
+
+def compare(candidate, texts, labels, repeats=1, **candidate_kwargs):
+    if not texts:
+        raise ValueError("The sample has no reviews with text to compare")
+    reference_predict, reference_size = torch_variant(quantize=False)
+    candidate_predict, candidate_size = CANDIDATES[candidate](**candidate_kwargs)
+
+    reference_predictions, reference_seconds = run(reference_predict, texts, repeats)
+    candidate_predictions, candidate_seconds = run(candidate_predict, texts, repeats)
+
+    agreement = sum(r == c for r, c in zip(reference_predictions, candidate_predictions)) / len(texts)
+    disagreements = [
+        {"text": text[:120], "reference": r, "candidate": c}
+        for text, r, c in zip(texts, reference_predictions, candidate_predictions) if r != c
+    ]
+    return {
+        "candidate": candidate,
+        "samples": len(texts),
+        "agreement": agreement,
+        "reference_accuracy": accuracy(reference_predictions, labels),
+        "candidate_accuracy": accuracy(candidate_predictions, labels),
+        "reference_seconds": reference_seconds,
+        "candidate_seconds": candidate_seconds,
+        "speedup": reference_seconds / candidate_seconds if candidate_seconds else None,
+        "reference_size_bytes": reference_size,
+        "candidate_size_bytes": candidate_size,
+        "disagreements": disagreements[:20]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a sentiment model variant with the fp32 model")
+    parser.add_argument("--candidate", choices=sorted(CANDIDATES), default="int8")
+    parser.add_argument("--sample", default=str(SENTIMENT_JSON_FILE), help="JSON file of labelled reviews")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N reviews")
+    parser.add_argument("--repeats", type=int, default=1, help="Timed passes per model")
+    args = parser.parse_args()
+
+    texts, labels = load_sample(args.sample, args.limit)
+    print(f"Comparing fp32 and {args.candidate} on {len(texts)} reviews from {args.sample}")
+    report = compare(args.candidate, texts, labels, args.repeats)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+from app.core.config import SUMMARY_TIMINGS_FILE
+from app.core.storage import save_json_atomic
+
+# Named generate() settings for the summarizer, lightest first. None of them samples:
+# beam search and sampling together waste the beams.
+DECODING_PROFILES = {
+    "fast": dict(
+        min_length=30,
+        max_length=150,
+        num_beams=1,
+        do_sample=False,
+        repetition_penalty=2.5,
+        no_repeat_ngram_size=2,
+        use_cache=True
+    ),
+    "balanced": dict(
+        min_length=50,
+        max_length=200,
+        num_beams=3,
+        do_sample=False,
+        repetition_penalty=2.5,
+        length_penalty=1.0,
+        early_stopping=True,
+        no_repeat_ngram_size=2,
+        use_cache=True
+    ),
+    "quality": dict(
+        min_length=50,
+        max_length=200,
+        num_beams=6,
+        do_sample=False,
+        repetition_penalty=2.5,
+        length_penalty=1.0,
+        early_stopping=True,
+        no_repeat_ngram_size=2,
+        use_cache=True
+    ),
+}
+
+# Rough CPU seconds per generated token, used until a profile has been measured
+DEFAULT_SECONDS_PER_TOKEN = {"fast": 0.02, "balanced": 0.05, "quality": 0.1}
+
+
+def partial_kwargs(profile, max_tokens):
+    """Settings for partial summaries, which only feed the next level and are kept short"""
+    return dict(DECODING_PROFILES[profile], min_length=min(20, max_tokens), max_length=max_tokens)
+
+
+class DecodeTimings:
+    """
+    Measured generate() time per output token for each profile, persisted across runs.
+
+    Kept as an exponential moving average so the estimate follows the current machine.
+    """
+
+    def __init__(self, path=SUMMARY_TIMINGS_FILE, smoothing=0.3):
+        self.path = str(path)
+        self.smoothing = smoothing
+        self.seconds_per_token = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.seconds_per_token = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not read decoding timings from {self.path}: {e}")
+
+    def record(self, profile, seconds, tokens):
+        if tokens <= 0:
+            return
+        measured = seconds / tokens
+        with self._lock:
+            previous = self.seconds_per_token.get(profile)
+            self.seconds_per_token[profile] = measured if previous is None else (
+                previous + self.smoothing * (measured - previous))
+
+    def estimate(self, profile, tokens):
+        """Expected seconds to generate `tokens` output tokens with `profile`"""
+        per_token = self.seconds_per_token.get(profile, DEFAULT_SECONDS_PER_TOKEN[profile])
+        return per_token * tokens
+
+    def save(self):
+        with self._lock:
+            save_json_atomic(self.path, self.seconds_per_token, indent=2)
+
+
+decode_timings = DecodeTimings()
+
+
+def choose_profile(max_latency, estimate_tokens):
+    """
+    Heaviest profile expected to finish within max_latency seconds, or "fast" if none does.
+
+    estimate_tokens(profile) returns how many tokens the job would generate with it.
+    """
+    for profile in reversed(list(DECODING_PROFILES)):
+        if decode_timings.estimate(profile, estimate_tokens(profile)) <= max_latency:
+            return profile
+    return "fast"
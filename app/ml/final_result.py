@@ -3,54 +3,130 @@ from collections import Counter
 import re
 import os
 import string
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import nltk
-from app.core.config import SENTIMENT_JSON_FILE, DATA_DIR
-
-import pandas as pd
-from transformers import T5Tokenizer, T5ForConditionalGeneration
-
-tokenizer = T5Tokenizer.from_pretrained("cahya/t5-base-indonesian-summarization-cased")
-model = T5ForConditionalGeneration.from_pretrained("cahya/t5-base-indonesian-summarization-cased")
-
-# Download nltk resources
-nltk.download('punkt')
-nltk.download('punkt_tab')
-nltk.download('stopwords')
-
-# Load Indonesian stopwords
-stop_words = set(stopwords.words('indonesian'))
-
-# Load stemmer
-factory = StemmerFactory()
-stemmer = factory.create_stemmer()
-stopword_factory = StopWordRemoverFactory()
-indo_stopwords = set(stopword_factory.get_stop_words())
-
-
-def summarize_reviews(data):
+import time
+from app.core.config import (
+    SENTIMENT_JSON_FILE, DATA_DIR, SUMMARY_CHUNK_TOKENS, SUMMARY_PARTIAL_MAX_TOKENS, SUMMARY_FAN_IN,
+    SUMMARY_MAX_DEPTH, SUMMARY_GENERATE_BATCH_SIZE, SUMMARY_DEFAULT_PROFILE
+)
+# T5, NLTK data and the Sastrawi stemmer are loaded on first use, not at import
+from app.ml.resources import summarizer, nltk_resources, sastrawi_resources
+from app.ml.stemming import cached_stemmer
+from app.ml.decoding import DECODING_PROFILES, partial_kwargs, decode_timings, choose_profile
+
+
+# Input window of the T5 summarizer
+MAX_INPUT_TOKENS = 512
+
+def pack_texts(texts, tokenizer, max_tokens=SUMMARY_CHUNK_TOKENS, max_items=None):
+    """
+    Greedily pack texts, in order, into '. '-joined chunks of at most max_tokens tokens
+    (and at most max_items texts). A text longer than max_tokens gets a chunk of its
+    own and is truncated when encoded.
+    """
+    lengths = [len(ids) + 1 for ids in tokenizer(list(texts), add_special_tokens=False)['input_ids']]
+    chunks = []
+    current, current_tokens = [], 0
+    for text, length in zip(texts, lengths):
+        if current and (current_tokens + length > max_tokens or (max_items and len(current) >= max_items)):
+            chunks.append('. '.join(current))
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += length
+    if current:
+        chunks.append('. '.join(current))
+    return chunks
+
+
+def generate_summaries(texts, profile=SUMMARY_DEFAULT_PROFILE, partial=False,
+                       batch_size=SUMMARY_GENERATE_BATCH_SIZE):
+    """
+    Summarize each text with a decoding profile, running them through model.generate
+    in padded batches. Generation time per output token is recorded for the profile.
+    """
+    tokenizer, model = summarizer.get()
+    if partial:
+        generate_kwargs = partial_kwargs(profile, SUMMARY_PARTIAL_MAX_TOKENS)
+    else:
+        generate_kwargs = DECODING_PROFILES[profile]
+    summaries = []
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[start:start + batch_size], return_tensors='pt', padding=True,
+                           truncation=True, max_length=MAX_INPUT_TOKENS)
+        started = time.perf_counter()
+        summary_ids = model.generate(input_ids=inputs['input_ids'], attention_mask=inputs['attention_mask'],
+                                     **generate_kwargs)
+        decode_timings.record(profile, time.perf_counter() - started, summary_ids.numel())
+        summaries.extend(tokenizer.batch_decode(summary_ids, skip_special_tokens=True))
+    return summaries
+
+
+def summary_levels(reviews, tokenizer, fan_in=SUMMARY_FAN_IN, max_depth=SUMMARY_MAX_DEPTH):
+    """Number of partial summaries summarize_reviews will generate at each level"""
+    levels = []
+    chunks = len(pack_texts(reviews, tokenizer))
+    while chunks > 1 and len(levels) < max_depth:
+        levels.append(chunks)
+        chunks = -(-chunks // fan_in)
+    return levels
+
+
+def estimate_generated_tokens(group_levels, profile):
+    """
+    Upper bound on the tokens generated to summarize every group with `profile`.
+
+    group_levels holds the summary_levels() of each group, which do not depend on the profile.
+    """
+    tokens = 0
+    for levels in group_levels:
+        tokens += sum(levels) * SUMMARY_PARTIAL_MAX_TOKENS
+        tokens += DECODING_PROFILES[profile]['max_length']
+    return tokens
+
+
+def summarize_groups(review_groups, profile=SUMMARY_DEFAULT_PROFILE, fan_in=SUMMARY_FAN_IN,
+                     max_depth=SUMMARY_MAX_DEPTH):
+    """
+    Summarize several groups of reviews (e.g. one per sentiment) map-reduce style.
+
+    Each group's reviews are packed into chunks that fit the model's input window.
+    At every level the chunks of all groups that still have more than one are
+    summarized together in padded batches, and each group's partial summaries are
+    packed again, `fan_in` per chunk, until one chunk per group is left or
+    `max_depth` levels have run. The final summaries of all groups are then
+    generated in one batch.
+
+    Returns:
+        Dict of group key -> summary; empty groups are left out
+    """
+    tokenizer, _ = summarizer.get()
+    chunks = {key: pack_texts(reviews, tokenizer) for key, reviews in review_groups.items() if reviews}
+
+    for _ in range(max_depth):
+        pending = [key for key, group_chunks in chunks.items() if len(group_chunks) > 1]
+        if not pending:
+            break
+        partials = generate_summaries([chunk for key in pending for chunk in chunks[key]], profile, partial=True)
+        start = 0
+        for key in pending:
+            count = len(chunks[key])
+            chunks[key] = pack_texts(partials[start:start + count], tokenizer, max_items=fan_in)
+            start += count
+
+    for key, group_chunks in chunks.items():
+        if len(group_chunks) > 1:
+            # Out of levels: what does not fit in the input window is truncated
+            print(f"Summarization of '{key}' stopped at depth {max_depth} with {len(group_chunks)} chunks left")
+            chunks[key] = ['. '.join(group_chunks)]
+
+    keys = list(chunks)
+    summaries = generate_summaries([chunks[key][0] for key in keys], profile)
+    return dict(zip(keys, summaries))
+
+
+def summarize_reviews(data, profile=SUMMARY_DEFAULT_PROFILE, fan_in=SUMMARY_FAN_IN, max_depth=SUMMARY_MAX_DEPTH):
+    """Summarize one list of reviews; see summarize_groups"""
     reviews = [item.get('review_text', '') for item in data if item.get('review_text')]
-    text = '. '.join(reviews)
-    input_ids = tokenizer.encode(text, return_tensors='pt')
-    summary_ids = model.generate(
-        input_ids,
-        min_length=50,
-        max_length=200,
-        num_beams=10,
-        repetition_penalty=2.5,
-        length_penalty=1.0,
-        early_stopping=True,
-        no_repeat_ngram_size=2,
-        use_cache=True,
-        do_sample=True,
-        temperature=0.8,
-        top_k=50,
-        top_p=0.95
-    )
-    return tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+    return summarize_groups({'reviews': reviews}, profile, fan_in, max_depth).get('reviews', '')
 
 # Regex to clean text
 def clean_text(text):
@@ -60,16 +136,17 @@ def clean_text(text):
     return text
 
 # Preprocess text: clean, stem, remove stopwords
-def preprocess_text(text):
+def filter_tokens(text):
+    word_tokenize, stop_words = nltk_resources.get()
+    stop_words = stop_words or sastrawi_resources.get()[1]
     # Tokenize
     tokens = word_tokenize(clean_text(text))
-    # Remove stopwords, stem, remove words less than 3 letters
-    filtered = [
-        stemmer.stem(word)
-        for word in tokens
-        if word not in (stop_words or indo_stopwords) and word.isalpha() and len(word) >= 3
-    ]
-    return filtered
+    # Remove stopwords, remove words less than 3 letters
+    return [word for word in tokens if word not in stop_words and word.isalpha() and len(word) >= 3]
+
+def preprocess_text(text):
+    # Stemmed through the memoized stemmer, so each distinct word is stemmed once
+    return cached_stemmer.stem_many(filter_tokens(text))
 
 # Load reviews from JSON
 def load_reviews(json_path):
@@ -104,7 +181,13 @@ def convert_set_to_list(obj):
         return obj
 
 # Main function
-def main_result():
+def main_result(profile=None, max_latency=None):
+    """
+    Build keywords and summaries per sentiment and save them to the summary JSON.
+
+    `profile` names a decoding profile (see app.ml.decoding). With `max_latency` in
+    seconds the heaviest profile expected to fit the budget is used instead.
+    """
     data = load_reviews(SENTIMENT_JSON_FILE)
     print(f"Loaded {len(data)} reviews from {SENTIMENT_JSON_FILE}")
     sentiment_groups = process_reviews_by_sentiment(data)
@@ -113,17 +196,29 @@ def main_result():
     for sentiment, reviews in sentiment_groups.items():
         all_words = []
         for review in reviews:
-            all_words.extend(preprocess_text(review))
-        results[sentiment] = generate_keyword_json(all_words)
-    print("Generated keywords for each sentiment.")
-
-    # Generate summaries for each sentiment
-    summaries = {}
-    for sentiment, reviews in sentiment_groups.items():
-        # Only summarize if there are non-empty, non-blank reviews
-        non_blank_reviews = [r for r in reviews if r and r.strip()]
-        if non_blank_reviews:
-            summaries[sentiment] = summarize_reviews([{"review_text": r} for r in non_blank_reviews])
+            all_words.extend(filter_tokens(review))
+        results[sentiment] = generate_keyword_json(cached_stemmer.stem_many(all_words))
+    cached_stemmer.save()
+    print(f"Generated keywords for each sentiment (stem cache: {cached_stemmer.stats()}).")
+
+    # Only summarize if there are non-empty, non-blank reviews
+    summary_groups = {
+        sentiment: [r for r in reviews if r and r.strip()] for sentiment, reviews in sentiment_groups.items()
+    }
+    summary_groups = {sentiment: reviews for sentiment, reviews in summary_groups.items() if reviews}
+
+    requested_profile = profile
+    if max_latency is not None and summary_groups:
+        # Chunking is the same for every profile, so pack the reviews only once
+        tokenizer, _ = summarizer.get()
+        group_levels = [summary_levels(reviews, tokenizer) for reviews in summary_groups.values()]
+        profile = choose_profile(max_latency, lambda candidate: estimate_generated_tokens(group_levels, candidate))
+    profile = profile or SUMMARY_DEFAULT_PROFILE
+    print(f"Summarizing with the '{profile}' decoding profile")
+
+    # Generate summaries for all sentiments in shared batches
+    summaries = summarize_groups(summary_groups, profile) if summary_groups else {}
+    decode_timings.save()
     print("Generated summaries for each sentiment.")
 
     # Save all keywords and summaries in one JSON file
@@ -141,6 +236,11 @@ def main_result():
         },
         "negative": {
             "keywords": results.get("negative", [])
+        },
+        "decoding": {
+            "profile": profile,
+            "requested_profile": requested_profile,
+            "max_latency": max_latency
         }
     }
 
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from app.core.config import SENTIMENT_SERVICE_MAX_BATCH, SENTIMENT_SERVICE_MAX_WAIT_MS, SENTIMENT_SERVICE_TIMEOUT
+from app.ml.model_manager import sentiment_model_manager
+from app.ml.sentiment_analysis import classify_reviews_batch
+
+
+class SentimentInferenceService:
+    """
+    Collect classification requests from concurrent callers into shared batches.
+
+    Requests are queued on the event loop. A single worker task takes the first
+    waiting request, keeps collecting until `max_batch` reviews are queued or
+    `max_wait_ms` have passed, runs the combined batch on the shared model in one
+    dedicated thread and resolves every caller's future with its own labels.
+
+    Async code awaits classify(); code running in executor threads (the scrape
+    pipeline) calls classify_threadsafe().
+    """
+
+    def __init__(self, max_batch=SENTIMENT_SERVICE_MAX_BATCH, max_wait_ms=SENTIMENT_SERVICE_MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        # One thread, so only one forward pass runs on the model at a time
+        self._executor = None
+
+        self.requests = 0
+        self.batches = 0
+        self.reviews = 0
+
+    def start(self):
+        """Start the batching worker on the running event loop"""
+        if self._worker is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment-inference")
+        self._worker = self._loop.create_task(self._run())
+
+    def is_running(self):
+        return self._worker is not None and not self._worker.done()
+
+    async def classify(self, review_texts):
+        """Return sentiment labels aligned with review_texts, like classify_reviews_batch"""
+        review_texts = [str(text) for text in review_texts]
+        if not review_texts:
+            return []
+        if not self.is_running():
+            raise RuntimeError("Sentiment inference service is not running")
+        future = self._loop.create_future()
+        await self._queue.put((review_texts, future))
+        return await future
+
+    def classify_threadsafe(self, review_texts, timeout=SENTIMENT_SERVICE_TIMEOUT):
+        """Blocking classify() for callers outside the event loop thread, giving up after `timeout` seconds"""
+        if not self.is_running():
+            raise RuntimeError("Sentiment inference service is not running")
+        future = asyncio.run_coroutine_threadsafe(self.classify(review_texts), self._loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Sentiment inference service did not answer within {timeout}s")
+
+    async def _collect(self, pending):
+        """Wait for one request, then gather more into `pending` until the batch is full or the wait is over"""
+        pending.append(await self._queue.get())
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            pending.append(request)
+            size += len(request[0])
+
+    def _predict(self, review_texts):
+        model, tokenizer, device = sentiment_model_manager.get()
+        return classify_reviews_batch(review_texts, model, tokenizer, device)
+
+    @staticmethod
+    def _fail(requests, error):
+        for _, future in requests:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        pending = []
+        try:
+            while True:
+                pending = []
+                await self._collect(pending)
+                await self._run_batch(pending)
+        except asyncio.CancelledError:
+            # Requests taken off the queue would otherwise never be answered
+            self._fail(pending, RuntimeError("Sentiment inference service stopped"))
+            raise
+
+    async def _run_batch(self, pending):
+        review_texts = [text for texts, _ in pending for text in texts]
+        try:
+            sentiments = await self._loop.run_in_executor(self._executor, self._predict, review_texts)
+        except Exception as e:
+            self._fail(pending, e)
+            return
+
+        self.requests += len(pending)
+        self.batches += 1
+        self.reviews += len(review_texts)
+
+        start = 0
+        for texts, future in pending:
+            if not future.done():
+                future.set_result(sentiments[start:start + len(texts)])
+            start += len(texts)
+
+    async def close(self):
+        """Stop the worker and fail any requests still waiting"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        waiting = []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        self._fail(waiting, RuntimeError("Sentiment inference service stopped"))
+        self._executor.shutdown(wait=True)
+        self._worker = None
+
+    def stats(self):
+        return {
+            "running": self.is_running(),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_ms,
+            "requests": self.requests,
+            "batches": self.batches,
+            "reviews": self.reviews,
+            "mean_batch_size": self.reviews / self.batches if self.batches else None
+        }
+
+
+sentiment_inference_service = SentimentInferenceService()
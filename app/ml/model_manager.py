@@ -0,0 +1,82 @@
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SentimentModelManager:
+    """
+    Process-wide holder of the sentiment tokenizer and model.
+
+    The model is loaded once, either eagerly via load() at start-up or lazily on the
+    first get(), and shared by every request. Loading is guarded by a lock so
+    concurrent first requests do not load it twice.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pipeline = None
+        self.load_seconds = None
+        self.parameter_bytes = None
+        self.rss_increase_bytes = None
+
+    def get(self):
+        """Return (model, tokenizer, device), loading them on first use"""
+        pipeline = self._pipeline
+        if pipeline is None:
+            pipeline = self.load()
+        return pipeline
+
+    def load(self):
+        with self._lock:
+            if self._pipeline is not None:
+                return self._pipeline
+
+            # Imported here because sentiment_analysis itself uses this manager
+            from app.ml.sentiment_analysis import load_sentiment_pipeline
+
+            rss_before = _peak_rss_bytes()
+            start = time.perf_counter()
+            model, tokenizer, device = load_sentiment_pipeline()
+            self.load_seconds = time.perf_counter() - start
+
+            if hasattr(model, 'parameter_bytes'):
+                # Non-torch backends report their own footprint
+                self.parameter_bytes = model.parameter_bytes
+            else:
+                tensors = list(model.parameters()) + list(model.buffers())
+                self.parameter_bytes = sum(t.numel() * t.element_size() for t in tensors)
+            if rss_before is not None:
+                self.rss_increase_bytes = _peak_rss_bytes() - rss_before
+
+            print(f"Sentiment model loaded in {self.load_seconds:.2f}s "
+                  f"({self.parameter_bytes / 1e6:.0f} MB of weights)")
+            self._pipeline = (model, tokenizer, device)
+            return self._pipeline
+
+    def load_in_background(self):
+        threading.Thread(target=self.load, name="sentiment-model-load", daemon=True).start()
+
+    def is_loaded(self):
+        return self._pipeline is not None
+
+    def stats(self):
+        return {
+            "loaded": self.is_loaded(),
+            "load_seconds": self.load_seconds,
+            "parameter_bytes": self.parameter_bytes,
+            "peak_rss_increase_bytes": self.rss_increase_bytes
+        }
+
+
+sentiment_model_manager = SentimentModelManager()
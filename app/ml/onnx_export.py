@@ -0,0 +1,71 @@
+"""
+Export the fine-tuned IndoBERT sentiment model to ONNX for the onnxruntime backend.
+
+Usage:
+    python -m app.ml.onnx_export
+    python -m app.ml.onnx_export --check --sample data/labelled.json --limit 500
+
+--check classifies the sample with both backends and exits with status 1 if any
+label differs, so it can gate a deployment that sets SENTIMENT_BACKEND=onnx.
+"""
+import argparse
+import json
+import sys
+import torch
+from app.core.config import MODEL_PATH, PRETRAINED_MODEL, SENTIMENT_ONNX_PATH, SENTIMENT_JSON_FILE
+from app.ml.sentiment_analysis import load_sentiment_model
+
+OPSET_VERSION = 14
+
+
+def export_onnx(model_path=MODEL_PATH, onnx_path=SENTIMENT_ONNX_PATH, opset_version=OPSET_VERSION):
+    """Trace the fp32 torch model on CPU and write it to onnx_path"""
+    device = torch.device('cpu')
+    model = load_sentiment_model(model_path, device, model_name=PRETRAINED_MODEL, num_labels=3)
+    model.config.return_dict = False
+
+    # Shape only matters for tracing; batch and sequence axes are exported as dynamic
+    dummy_ids = torch.ones((2, 16), dtype=torch.long)
+    dummy_mask = torch.ones((2, 16), dtype=torch.long)
+    torch.onnx.export(
+        model,
+        (dummy_ids, dummy_mask),
+        str(onnx_path),
+        input_names=['input_ids', 'attention_mask'],
+        output_names=['logits'],
+        dynamic_axes={
+            'input_ids': {0: 'batch', 1: 'sequence'},
+            'attention_mask': {0: 'batch', 1: 'sequence'},
+            'logits': {0: 'batch'}
+        },
+        opset_version=opset_version,
+        do_constant_folding=True
+    )
+    print(f"Exported ONNX model to {onnx_path}")
+    return onnx_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the sentiment model to ONNX")
+    parser.add_argument("--output", default=str(SENTIMENT_ONNX_PATH), help="Where to write the .onnx file")
+    parser.add_argument("--check", action="store_true", help="Check that labels match the torch backend")
+    parser.add_argument("--sample", default=str(SENTIMENT_JSON_FILE), help="JSON file of reviews for --check")
+    parser.add_argument("--limit", type=int, default=None, help="Only check the first N reviews")
+    args = parser.parse_args()
+
+    export_onnx(onnx_path=args.output)
+    if not args.check:
+        return
+
+    from app.ml.compare_models import load_sample, compare
+    texts, labels = load_sample(args.sample, args.limit)
+    report = compare("onnx", texts, labels, onnx_path=args.output)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if report["disagreements"]:
+        print(f"Parity check failed: agreement {report['agreement']:.4f}")
+        sys.exit(1)
+    print(f"Parity check passed on {len(texts)} reviews")
+
+
+if __name__ == "__main__":
+    main()
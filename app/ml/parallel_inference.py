@@ -0,0 +1,127 @@
+"""
+Sharded sentiment inference across worker processes, for bulk backfills.
+
+Usage:
+    python -m app.ml.parallel_inference --workers 4
+
+Each worker loads its own copy of the model once, with torch limited to its share of
+the CPU cores, and classifies contiguous shards of the review list. Results are
+merged back in the original order.
+"""
+import argparse
+import multiprocessing
+import os
+import torch
+from concurrent.futures import ProcessPoolExecutor
+from app.core.config import SENTIMENT_WORKERS, SENTIMENT_WORKER_THREADS, SENTIMENT_BATCH_SIZE
+
+
+def _init_worker(num_threads):
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already set in this process
+
+    from app.ml.model_manager import sentiment_model_manager
+    sentiment_model_manager.load()
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+def _classify_shard(review_texts):
+    from app.ml.model_manager import sentiment_model_manager
+    from app.ml.sentiment_analysis import classify_reviews_batch
+
+    model, tokenizer, device = sentiment_model_manager.get()
+    return classify_reviews_batch(review_texts, model, tokenizer, device)
+
+
+class ShardedSentimentClassifier:
+    """
+    Pool of worker processes with a preloaded sentiment model.
+
+    Use it as a context manager so the workers are shut down even if classification
+    fails:
+
+        with ShardedSentimentClassifier(workers=4) as classifier:
+            sentiments = classifier.classify(texts)
+    """
+
+    def __init__(self, workers=SENTIMENT_WORKERS, threads_per_worker=SENTIMENT_WORKER_THREADS,
+                 shards_per_worker=4):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.shards_per_worker = shards_per_worker
+        self._executor = None
+
+    def start(self):
+        """Spawn the workers and wait until every one has loaded the model"""
+        if self._executor is not None:
+            return self
+        # spawn rather than fork: forking a process that already runs torch threads can deadlock
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,)
+        )
+        try:
+            pids = {future.result() for future in
+                    [self._executor.submit(_worker_ready) for _ in range(self.workers)]}
+        except Exception:
+            self.close()
+            raise
+        print(f"Sentiment worker pool ready: {len(pids)} processes, "
+              f"{self.threads_per_worker} torch threads each")
+        return self
+
+    def _shards(self, review_texts):
+        # Several shards per worker keep the pool balanced when some shards run slower
+        shard_size = -(-len(review_texts) // (self.workers * self.shards_per_worker))
+        shard_size = max(shard_size, SENTIMENT_BATCH_SIZE)
+        return [review_texts[i:i + shard_size] for i in range(0, len(review_texts), shard_size)]
+
+    def classify(self, review_texts):
+        """Return sentiment labels aligned with review_texts, like classify_reviews_batch"""
+        if self._executor is None:
+            self.start()
+        review_texts = [str(text) for text in review_texts]
+        if not review_texts:
+            return []
+        sentiments = []
+        for shard_sentiments in self._executor.map(_classify_shard, self._shards(review_texts)):
+            sentiments.extend(shard_sentiments)
+        return sentiments
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        # Workers are spawned on the first classify() (or an explicit start()), so a
+        # fully cached backfill never pays for loading the model
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    from app.ml.sentiment_analysis import process_reviews_json
+
+    parser = argparse.ArgumentParser(description="Classify the stored reviews with a pool of worker processes")
+    parser.add_argument("--workers", type=int, default=SENTIMENT_WORKERS or os.cpu_count(),
+                        help="Number of worker processes")
+    parser.add_argument("--threads", type=int, default=SENTIMENT_WORKER_THREADS,
+                        help="Torch threads per worker (default: cores / workers)")
+    args = parser.parse_args()
+
+    process_reviews_json(workers=args.workers, threads_per_worker=args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Lazily loaded resources for keyword extraction and summarization.
+
+Nothing here is loaded at import time, so importing the summary router does not
+pull in T5 or touch the network. Each resource loads on first use (or through an
+explicit warm-up), and check_resources() reports what is available offline
+without loading anything.
+"""
+import importlib.util
+import threading
+import time
+from app.core.config import SUMMARY_MODEL_NAME, NLTK_AUTO_DOWNLOAD
+
+# NLTK data needed by word_tokenize and the stopword list, as (nltk.data path, package)
+NLTK_RESOURCES = [
+    ('tokenizers/punkt', 'punkt'),
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('corpora/stopwords', 'stopwords'),
+]
+
+
+class LazyResource:
+    """Load a value once, on first get(), guarded by a lock"""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+        self.load_seconds = None
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                self._value = self._loader()
+                self.load_seconds = time.perf_counter() - start
+                self._loaded = True
+                print(f"Loaded {self.name} in {self.load_seconds:.2f}s")
+        return self._value
+
+    def is_loaded(self):
+        return self._loaded
+
+    def stats(self):
+        return {"loaded": self._loaded, "load_seconds": self.load_seconds}
+
+
+def _missing_nltk_resources():
+    import nltk
+
+    missing = []
+    for path, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(package)
+    return missing
+
+
+def _load_nltk():
+    import nltk
+
+    missing = _missing_nltk_resources()
+    if missing and not NLTK_AUTO_DOWNLOAD:
+        raise LookupError(f"Missing NLTK resources {missing}; install them with "
+                          f"python -m nltk.downloader {' '.join(missing)}")
+    for package in missing:
+        nltk.download(package, quiet=True)
+
+    from nltk.corpus import stopwords
+    from nltk.tokenize import word_tokenize
+    return word_tokenize, set(stopwords.words('indonesian'))
+
+
+def _load_sastrawi():
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+
+    stemmer = StemmerFactory().create_stemmer()
+    indo_stopwords = set(StopWordRemoverFactory().get_stop_words())
+    return stemmer, indo_stopwords
+
+
+def _load_summarizer():
+    from transformers import T5Tokenizer, T5ForConditionalGeneration
+
+    tokenizer = T5Tokenizer.from_pretrained(SUMMARY_MODEL_NAME)
+    model = T5ForConditionalGeneration.from_pretrained(SUMMARY_MODEL_NAME)
+    model.eval()
+    return tokenizer, model
+
+
+nltk_resources = LazyResource("NLTK resources", _load_nltk)
+sastrawi_resources = LazyResource("Sastrawi stemmer", _load_sastrawi)
+summarizer = LazyResource(f"summarization model {SUMMARY_MODEL_NAME}", _load_summarizer)
+
+
+def check_resources():
+    """
+    Report which resources are available locally, without loading them or using the network.
+
+    Returns:
+        Dict with 'ready' and per-resource details
+    """
+    report = {}
+
+    if importlib.util.find_spec('nltk') is None:
+        report['nltk'] = {"available": False, "missing": ["nltk package"]}
+    else:
+        missing = _missing_nltk_resources()
+        report['nltk'] = {"available": not missing, "missing": missing}
+
+    report['sastrawi'] = {"available": importlib.util.find_spec('Sastrawi') is not None}
+
+    try:
+        from huggingface_hub import try_to_load_from_cache
+        cached = try_to_load_from_cache(SUMMARY_MODEL_NAME, 'config.json')
+        report['summarizer'] = {"available": isinstance(cached, str), "model": SUMMARY_MODEL_NAME}
+    except ImportError:
+        report['summarizer'] = {"available": False, "model": SUMMARY_MODEL_NAME}
+
+    report['ready'] = all(entry['available'] for entry in report.values())
+    return report
+
+
+def warm_up():
+    """Load every resource now instead of on the first summary request"""
+    nltk_resources.get()
+    sastrawi_resources.get()
+    summarizer.get()
+
+
+def stats():
+    return {
+        "nltk": nltk_resources.stats(),
+        "sastrawi": sastrawi_resources.stats(),
+        "summarizer": summarizer.stats()
+    }
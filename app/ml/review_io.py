@@ -0,0 +1,132 @@
+"""
+Streaming reader and writer for review JSON files.
+
+Review files come in three shapes: a list of review records, a dict whose first key
+'reviews' holds that list, or a dict mapping an id to the review text. iter_review_records
+reads any of them one record at a time (with ijson when installed) and
+JsonArrayWriter writes results back out as they are produced, so large backfill
+files never have to be held in memory as a whole.
+"""
+import json
+import os
+from app.core.storage import open_temp_file, remove_temp_file
+
+try:
+    import ijson
+except ImportError:  # Optional; without it the file is parsed with json.load
+    ijson = None
+
+
+def get_review_text(review_item):
+    """Extract the review text from a review record, or None if it has none"""
+    if isinstance(review_item, dict) and 'review_text' in review_item:
+        return review_item['review_text']
+    elif isinstance(review_item, dict) and 'review' in review_item:
+        return review_item['review']
+    elif isinstance(review_item, str):
+        return review_item
+    return None
+
+
+def _normalize_item(index, review_item):
+    return index, get_review_text(review_item), review_item
+
+
+def _normalize_pair(key, value):
+    return key, (None if value is None else value if isinstance(value, str) else str(value)), None
+
+
+def _detect_shape(f):
+    """Return 'list', 'reviews' or 'mapping' from the first events of the document"""
+    events = ijson.parse(f)
+    _, event, _ = next(events, (None, None, None))
+    if event == 'start_array':
+        return 'list'
+    if event != 'start_map':
+        return None
+    # Only the first key is read, so a large id -> text file is not parsed twice
+    _, event, value = next(events)
+    if event == 'map_key' and value == 'reviews' and next(events)[1] == 'start_array':
+        return 'reviews'
+    return 'mapping'
+
+
+def _has_review_list(data):
+    return isinstance(data, dict) and next(iter(data), None) == 'reviews' and isinstance(data['reviews'], list)
+
+
+def _iter_streaming(path):
+    with open(path, 'rb') as f:
+        shape = _detect_shape(f)
+        f.seek(0)
+        if shape == 'list':
+            for i, item in enumerate(ijson.items(f, 'item', use_float=True)):
+                yield _normalize_item(i, item)
+        elif shape == 'reviews':
+            for i, item in enumerate(ijson.items(f, 'reviews.item', use_float=True)):
+                yield _normalize_item(i, item)
+        elif shape == 'mapping':
+            for key, value in ijson.kvitems(f, '', use_float=True):
+                yield _normalize_pair(key, value)
+
+
+def _iter_loaded(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if _has_review_list(data):
+        data = data['reviews']
+    if isinstance(data, list):
+        for i, item in enumerate(data):
+            yield _normalize_item(i, item)
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield _normalize_pair(key, value)
+
+
+def iter_review_records(path):
+    """
+    Yield (id, text, record) for every review in a JSON file of any supported shape.
+
+    id is the list index or the dict key, text is None when the record has none, and
+    record is the original review (None for id -> text files).
+    """
+    if ijson is not None:
+        return _iter_streaming(path)
+    return _iter_loaded(path)
+
+
+class JsonArrayWriter:
+    """
+    Write a JSON array one record at a time.
+
+    The array goes to a temporary file that replaces `path` only when the writer is
+    closed without an error, so readers never see a half-written file.
+    """
+
+    def __init__(self, path, indent=4):
+        self.path = str(path)
+        self.indent = indent
+        self.count = 0
+        self._tmp_path = None
+        self._file = None
+
+    def __enter__(self):
+        # A temp file of its own, so concurrent writers of the same path do not collide
+        self._file, self._tmp_path = open_temp_file(self.path)
+        self._file.write('[')
+        return self
+
+    def write(self, record):
+        text = json.dumps(record, indent=self.indent)
+        if self.indent is not None:
+            text = '\n' + '\n'.join(' ' * self.indent + line for line in text.splitlines())
+        self._file.write((',' if self.count else '') + text)
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.write('\n]' if self.count and self.indent is not None else ']')
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            remove_temp_file(self._tmp_path)
@@ -1,24 +1,46 @@
 import torch
-import json
+import contextlib
+import queue
+import threading
 import pandas as pd
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from app.core.config import MODEL_PATH, JSON_FILE, PRETRAINED_MODEL, DATA_DIR
+from transformers.modeling_outputs import SequenceClassifierOutput
+from app.core.config import (
+    MODEL_PATH, JSON_FILE, PRETRAINED_MODEL, DATA_DIR, SENTIMENT_STREAM_BATCH_SIZE,
+    SENTIMENT_BATCH_SIZE, SENTIMENT_SORT_BY_LENGTH, SENTIMENT_CACHE_ENABLED, SENTIMENT_QUANTIZE,
+    SENTIMENT_BACKEND, SENTIMENT_ONNX_PATH, SENTIMENT_WORKERS, SENTIMENT_WORKER_THREADS,
+    SENTIMENT_JSON_CHUNK_SIZE, SENTIMENT_CASCADE_ENABLED, SENTIMENT_CASCADE_THRESHOLD,
+    SENTIMENT_CASCADE_AUDIT_RATE, SENTIMENT_PREFETCH_MAX_PENDING
+)
+from app.ml.model_manager import sentiment_model_manager
+from app.ml.sentiment_cache import get_sentiment_cache
+from app.ml.review_io import get_review_text, iter_review_records, JsonArrayWriter
+from app.ml.cascade import get_first_stage_model, cascade_stats
 import os
+import random
+
+# Assuming 3 classes: negative (0), neutral (1), positive (2)
+SENTIMENT_LABELS = {0: "negative", 1: "neutral", 2: "positive"}
 
 def preprocess_text(text, tokenizer, max_length=128):
-    """Tokenize the input text"""
+    """Tokenize the input text (no padding needed for a single review)"""
     encoded_text = tokenizer.encode_plus(
         text,
         max_length=max_length,
-        padding='max_length',
         truncation=True,
         return_tensors='pt'
     )
     
     return encoded_text
 
-def load_sentiment_model(model_path, device, model_name="indolem/indobert-base-uncased", num_labels=3):
-    """Load the sentiment analysis model"""
+def load_sentiment_model(model_path, device, model_name="indolem/indobert-base-uncased", num_labels=3,
+                         quantize=False):
+    """
+    Load the sentiment analysis model
+
+    With quantize=True the Linear layers are dynamically quantized to int8, which
+    only applies to CPU inference.
+    """
     # Initialize the model
     model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=num_labels)
     
@@ -32,9 +54,44 @@ def load_sentiment_model(model_path, device, model_name="indolem/indobert-base-u
         model = torch.nn.DataParallel(model)
         
     model.eval()
+
+    if quantize:
+        if device.type == 'cpu':
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            print("Using int8 dynamically quantized model")
+        else:
+            print("Quantization is only supported on CPU, using the fp32 model")
     
     return model
 
+class OnnxSentimentModel:
+    """
+    ONNX Runtime stand-in for the torch model.
+
+    Called like the torch model with input_ids / attention_mask tensors and returns an
+    output with .logits, so the classification functions work with either backend.
+    """
+
+    def __init__(self, onnx_path=SENTIMENT_ONNX_PATH, num_threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The onnx sentiment backend needs the onnxruntime package") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(onnx_path), options, providers=['CPUExecutionProvider'])
+        self.parameter_bytes = os.path.getsize(onnx_path)
+
+    def __call__(self, input_ids, attention_mask):
+        logits = self.session.run(['logits'], {
+            'input_ids': input_ids.cpu().numpy(),
+            'attention_mask': attention_mask.cpu().numpy()
+        })[0]
+        return SequenceClassifierOutput(logits=torch.from_numpy(logits))
+
 def classify_review(review_text, model, tokenizer, device):
     """Classify a single review"""
     # Make sure review_text is a string
@@ -58,115 +115,356 @@ def classify_review(review_text, model, tokenizer, device):
             logits = outputs.logits
             _, preds = torch.max(logits, dim=1)
         
-        # Convert prediction to label - Assuming 3 classes: negative (0), neutral (1), positive (2)
-        sentiment_map = {0: "negative", 1: "neutral", 2: "positive"}
-        sentiment = sentiment_map[preds.item()]
+        # Convert prediction to label
+        sentiment = SENTIMENT_LABELS[preds.item()]
         
         return sentiment
     except Exception as e:
         print(f"Error processing review: {e}")
         return None
 
-def process_reviews_json():
-    """Process JSON file with reviews and classify sentiment"""
+def classify_reviews_batch(review_texts, model, tokenizer, device, batch_size=SENTIMENT_BATCH_SIZE,
+                           sort_by_length=SENTIMENT_SORT_BY_LENGTH, max_length=128):
+    """
+    Classify many reviews with batched inference.
+
+    Each batch is padded only to its longest review. With sort_by_length, reviews of
+    similar token length are batched together to minimise padding; the labels are
+    returned in the original order either way.
+
+    Returns:
+        List of sentiment labels aligned with review_texts (None for empty reviews)
+    """
+    review_texts = [str(text) for text in review_texts]
+    sentiments = [None] * len(review_texts)
+    indices = [i for i, text in enumerate(review_texts) if text.strip()]
+    if not indices:
+        return sentiments
+
+    # Tokenize everything once without padding; batches are padded below
+    encodings = tokenizer([review_texts[i] for i in indices], max_length=max_length, truncation=True)
+    features = {
+        i: {'input_ids': input_ids, 'attention_mask': attention_mask}
+        for i, input_ids, attention_mask in zip(indices, encodings['input_ids'], encodings['attention_mask'])
+    }
+    if sort_by_length:
+        indices.sort(key=lambda i: len(features[i]['input_ids']))
+
+    for start in range(0, len(indices), batch_size):
+        batch_indices = indices[start:start + batch_size]
+        try:
+            batch = tokenizer.pad([features[i] for i in batch_indices], padding='longest', return_tensors='pt')
+            with torch.no_grad():
+                outputs = model(input_ids=batch['input_ids'].to(device),
+                                attention_mask=batch['attention_mask'].to(device))
+                preds = torch.argmax(outputs.logits, dim=1).tolist()
+            for i, pred in zip(batch_indices, preds):
+                sentiments[i] = SENTIMENT_LABELS[pred]
+        except Exception as e:
+            print(f"Error processing batch, classifying its reviews one by one: {e}")
+            for i in batch_indices:
+                sentiments[i] = classify_review(review_texts[i], model, tokenizer, device)
+
+    return sentiments
+
+def classify_reviews_cached(review_texts, model=None, tokenizer=None, device=None, classify=None):
+    """
+    Like classify_reviews_batch, but look every review up in the sentiment cache first
+    and only run the model on the misses, writing their labels back in bulk.
+
+    `classify` replaces the in-process model for the misses, e.g. a worker pool's
+    classify method.
+    """
+    if classify is None:
+        def classify(texts):
+            return classify_reviews_batch(texts, model, tokenizer, device)
+
+    if not SENTIMENT_CACHE_ENABLED:
+        return classify(review_texts)
+
+    try:
+        cache = get_sentiment_cache()
+        sentiments = [None] * len(review_texts)
+        for i, sentiment in cache.get_many(review_texts).items():
+            sentiments[i] = sentiment
+    except Exception as e:
+        print(f"Sentiment cache unavailable: {e}")
+        return classify(review_texts)
+
+    misses = [i for i, sentiment in enumerate(sentiments) if sentiment is None]
+    print(f"Sentiment cache: {len(review_texts) - len(misses)} hits, {len(misses)} misses")
+    if misses:
+        predicted = classify([review_texts[i] for i in misses])
+        for i, sentiment in zip(misses, predicted):
+            sentiments[i] = sentiment
+        try:
+            cache.put_many([(review_texts[i], sentiments[i]) for i in misses])
+        except Exception as e:
+            print(f"Could not write to sentiment cache: {e}")
+
+    return sentiments
+
+def classify_reviews_cascade(review_texts, ratings=None, model=None, tokenizer=None, device=None, classify=None,
+                             threshold=SENTIMENT_CASCADE_THRESHOLD, audit_rate=SENTIMENT_CASCADE_AUDIT_RATE):
+    """
+    Label reviews the first-stage model is confident about and send only the rest
+    to IndoBERT (through classify_reviews_cached).
+
+    A random `audit_rate` share of the confident reviews is also classified by
+    IndoBERT to track how often the two stages agree; the first-stage label is kept.
+    Without a trained first-stage model every review goes to IndoBERT.
+    """
+    first_stage = get_first_stage_model()
+    if first_stage is None:
+        return classify_reviews_cached(review_texts, model, tokenizer, device, classify=classify)
+
+    threshold = threshold or first_stage.threshold
+    sentiments = [None] * len(review_texts)
+    uncertain = []
+    audited = []
+    for i, (label, confidence) in enumerate(first_stage.predict(review_texts, ratings)):
+        if label is not None and confidence >= threshold:
+            sentiments[i] = label
+            if random.random() < audit_rate:
+                audited.append(i)
+        else:
+            uncertain.append(i)
+
+    routed = uncertain + audited
+    predicted = classify_reviews_cached([review_texts[i] for i in routed], model, tokenizer, device,
+                                        classify=classify) if routed else []
+    for i, sentiment in zip(uncertain, predicted):
+        sentiments[i] = sentiment
+    audit_agreed = sum(sentiments[i] == sentiment for i, sentiment in zip(audited, predicted[len(uncertain):]))
+
+    cascade_stats.record(len(review_texts) - len(uncertain), len(uncertain), len(audited), audit_agreed)
+    return sentiments
+
+def classify_reviews(review_texts, ratings=None, model=None, tokenizer=None, device=None, classify=None):
+    """Classify reviews through the cascade when it is enabled, otherwise through the cache and IndoBERT"""
+    if SENTIMENT_CASCADE_ENABLED:
+        return classify_reviews_cascade(review_texts, ratings, model, tokenizer, device, classify=classify)
+    return classify_reviews_cached(review_texts, model, tokenizer, device, classify=classify)
+
+def load_sentiment_pipeline():
+    """
+    Load the device, tokenizer and model used for classification.
+
+    This always loads from disk; use sentiment_model_manager.get() for the shared copy.
+    """
+    # Load the tokenizer
+    tokenizer = AutoTokenizer.from_pretrained(PRETRAINED_MODEL)
+
+    if SENTIMENT_BACKEND == "onnx":
+        if os.path.exists(SENTIMENT_ONNX_PATH):
+            print(f"Using ONNX Runtime backend with {SENTIMENT_ONNX_PATH}")
+            return OnnxSentimentModel(SENTIMENT_ONNX_PATH), tokenizer, torch.device('cpu')
+        print(f"ONNX model not found at {SENTIMENT_ONNX_PATH} (run python -m app.ml.onnx_export), using torch")
+
     # Set device
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     print(f"Using device: {device}")
     
-    # Load the tokenizer
-    tokenizer = AutoTokenizer.from_pretrained(PRETRAINED_MODEL)
-    
     # Load the model
-    model = load_sentiment_model(MODEL_PATH, device, model_name=PRETRAINED_MODEL, num_labels=3)
+    model = load_sentiment_model(MODEL_PATH, device, model_name=PRETRAINED_MODEL, num_labels=3,
+                                 quantize=SENTIMENT_QUANTIZE)
+
+    return model, tokenizer, device
+
+def sentiment_output_file():
+    """Path of the classified reviews file, next to the scraped reviews file"""
+    return os.path.join(DATA_DIR, os.path.basename(JSON_FILE).replace('.json', '_with_sentiment.json'))
+
+def save_sentiment_results(results):
+    """Save classified reviews next to the scraped reviews file"""
+    output_file = sentiment_output_file()
+    with JsonArrayWriter(output_file) as writer:
+        for result in results:
+            writer.write(result)
     
-    # Load the JSON file
+    print(f"Results saved to {output_file}")
+    return output_file
+
+class _Prefetcher:
+    """
+    Run `iterable` in a background thread and hand its items over through a queue.
+
+    The producer starts right away, so scrolling overlaps with model loading. The queue
+    holds at most `max_pending` items. close() tells the producer to stop, which closes
+    `iterable` in its thread once the item being produced is done, and waits at most
+    `close_timeout` seconds for that.
+    """
+
+    _done = object()
+
+    def __init__(self, iterable, max_pending=SENTIMENT_PREFETCH_MAX_PENDING, close_timeout=5.0):
+        self.close_timeout = close_timeout
+        self._items = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._producer = threading.Thread(target=self._produce, args=(iterable,), name="review-producer",
+                                          daemon=True)
+        self._producer.start()
+
+    def _put(self, item):
+        # Give up once the consumer is gone instead of blocking on a full queue forever
+        while not self._stop.is_set():
+            try:
+                self._items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, iterable):
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not self._put(item):
+                    break
+        except BaseException as e:
+            self._put(e)
+        else:
+            self._put(self._done)
+        finally:
+            # Stop a generator where it is, so its post-exhaustion code does not run
+            if self._stop.is_set() and hasattr(iterator, 'close'):
+                iterator.close()
+
+    def __iter__(self):
+        """Yield lists of the items that arrived since the previous batch"""
+        while True:
+            item = self._items.get()
+            if item is self._done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            # Hand over everything that is already waiting so the consumer can batch it
+            batch = [item]
+            while True:
+                try:
+                    item = self._items.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._done or isinstance(item, BaseException):
+                    # Keep the end marker for the next round; the producer has finished putting
+                    self._items.put(item)
+                    break
+                batch.append(item)
+            yield batch
+
+    def close(self):
+        self._stop.set()
+        # The producer may be in the middle of a scroll pass; it finishes on its own
+        self._producer.join(self.close_timeout)
+
+def classify_review_stream(reviews, batch_size=SENTIMENT_STREAM_BATCH_SIZE, classify=None):
+    """
+    Classify reviews while they are still being produced.
+
+    `reviews` (e.g. a live scrape generator) is consumed in a background thread, so
+    scrolling and network waits overlap with model loading and inference. Reviews are
+    classified in micro-batches of whatever has arrived, up to `batch_size` at a time.
+
+    `classify` replaces the in-process model for cache misses, e.g. the shared
+    inference service's classify_threadsafe.
+
+    Yields:
+        Review records with a 'sentiment' key, in arrival order
+    """
+    # Closing the prefetcher stops the producer if classification fails or the caller stops early
+    with contextlib.closing(_Prefetcher(reviews)) as arrivals:
+        if classify is None:
+            model, tokenizer, device = sentiment_model_manager.get()
+        else:
+            model = tokenizer = device = None
+
+        count = 0
+        for arrived in arrivals:
+            for start in range(0, len(arrived), batch_size):
+                batch = []
+                for review_item in arrived[start:start + batch_size]:
+                    review_text = get_review_text(review_item)
+                    count += 1
+                    if review_text is None or not str(review_text).strip():
+                        print(f"Review {count}: Skipping due to null/empty content")
+                        continue
+                    batch.append((count, review_item, review_text))
+
+                sentiments = classify_reviews(
+                    [text for _, _, text in batch],
+                    [item.get('rating') if isinstance(item, dict) else None for _, item, _ in batch],
+                    model, tokenizer, device, classify=classify
+                )
+                for (number, review_item, review_text), sentiment in zip(batch, sentiments):
+                    print(f"Review {number}: {sentiment}")
+                    if isinstance(review_item, dict):
+                        review_item['sentiment'] = sentiment
+                        yield review_item
+                    else:
+                        yield {'text': review_text, 'sentiment': sentiment}
+
+def _classify_chunk(chunk, classify_texts, writer):
+    """Classify a chunk of (label, review_id, review_text, review_item) and write the results"""
+    sentiments = classify_texts(
+        [review_text for _, _, review_text, _ in chunk],
+        [review_item.get('rating') if isinstance(review_item, dict) else None for _, _, _, review_item in chunk]
+    )
+    for (label, review_id, review_text, review_item), sentiment in zip(chunk, sentiments):
+        print(f"{label}: {sentiment}")
+        
+        # Add the result
+        if review_item is None and not isinstance(review_id, int):
+            writer.write({'id': review_id, 'text': review_text, 'sentiment': sentiment})
+        elif isinstance(review_item, dict):
+            review_item['sentiment'] = sentiment
+            writer.write(review_item)
+        else:
+            writer.write({'text': review_text, 'sentiment': sentiment})
+
+def process_reviews_json(workers=SENTIMENT_WORKERS, threads_per_worker=SENTIMENT_WORKER_THREADS,
+                         chunk_size=SENTIMENT_JSON_CHUNK_SIZE):
+    """
+    Process JSON file with reviews and classify sentiment.
+
+    Reviews are streamed from JSON_FILE, classified `chunk_size` at a time and
+    written to the output file as they are classified, so memory use does not grow
+    with the file. With workers > 1 the reviews are sharded across a pool of worker
+    processes (see app.ml.parallel_inference) instead of the in-process model.
+
+    Returns:
+        Path of the written results file
+    """
     print(f"Loading reviews from {JSON_FILE}")
-    with open(JSON_FILE, 'r', encoding='utf-8') as f:
-        reviews_data = json.load(f)
-    
-    # Process each review in the JSON file
-    results = []
-    
-    # Determine the structure of the JSON
-    if isinstance(reviews_data, list):
-        # If it's a list of reviews
-        for i, review_item in enumerate(reviews_data):
-            # Extract review text based on the structure
-            review_text = None
-            if isinstance(review_item, dict) and 'review_text' in review_item:
-                review_text = review_item['review_text']
-            elif isinstance(review_item, dict) and 'review' in review_item:
-                review_text = review_item['review']
-            elif isinstance(review_item, str):
-                review_text = review_item
+    output_file = sentiment_output_file()
+
+    with contextlib.ExitStack() as stack:
+        if workers and workers > 1:
+            from app.ml.parallel_inference import ShardedSentimentClassifier
+            classifier = stack.enter_context(ShardedSentimentClassifier(workers, threads_per_worker))
+
+            def classify_texts(texts, ratings):
+                return classify_reviews(texts, ratings, classify=classifier.classify)
+        else:
+            def classify_texts(texts, ratings):
+                model, tokenizer, device = sentiment_model_manager.get()
+                return classify_reviews(texts, ratings, model, tokenizer, device)
+
+        writer = stack.enter_context(JsonArrayWriter(output_file))
+        chunk = []
+        for i, (review_id, review_text, review_item) in enumerate(iter_review_records(JSON_FILE)):
+            label = f"Review {i+1}" if isinstance(review_id, int) else f"Review {i+1} (key: {review_id})"
             
             # Skip null, None, empty strings, or whitespace-only strings
             if review_text is None or not str(review_text).strip():
-                print(f"Review {i+1}: Skipping due to null/empty content")
+                print(f"{label}: Skipping due to null/empty content")
                 continue
             
-            # Classify the review
-            sentiment = classify_review(review_text, model, tokenizer, device)
-            print(f"Review {i+1}: {sentiment}")
-            
-            # Add the result
-            if isinstance(review_item, dict):
-                review_item['sentiment'] = sentiment
-                results.append(review_item)
-            else:
-                results.append({'text': review_text, 'sentiment': sentiment})
-    
-    elif isinstance(reviews_data, dict):
-        # If it's a dictionary with reviews
-        if 'reviews' in reviews_data and isinstance(reviews_data['reviews'], list):
-            # Process the list of reviews
-            for i, review_item in enumerate(reviews_data['reviews']):
-                review_text = None
-                if isinstance(review_item, dict) and 'review_text' in review_item:
-                    review_text = review_item['review_text']
-                elif isinstance(review_item, dict) and 'review' in review_item:
-                    review_text = review_item['review']
-                elif isinstance(review_item, str):
-                    review_text = review_item
-                
-                # Skip null, None, empty strings, or whitespace-only strings
-                if review_text is None or not str(review_text).strip():
-                    print(f"Review {i+1}: Skipping due to null/empty content")
-                    continue
-                
-                # Classify the review
-                sentiment = classify_review(review_text, model, tokenizer, device)
-                print(f"Review {i+1}: {sentiment}")
-                
-                # Add the result
-                if isinstance(review_item, dict):
-                    review_item['sentiment'] = sentiment
-                    results.append(review_item)
-                else:
-                    results.append({'text': review_text, 'sentiment': sentiment})
-        else:
-            # Process each key as a separate review
-            for i, (key, value) in enumerate(reviews_data.items()):
-                # Skip null values
-                if value is None:
-                    print(f"Review with key '{key}': Skipping due to null content")
-                    continue
-                
-                review_text = value if isinstance(value, str) else str(value)
-                # Skip empty strings or whitespace-only strings
-                if not review_text.strip():
-                    print(f"Review with key '{key}': Skipping due to empty content")
-                    continue
-                
-                sentiment = classify_review(review_text, model, tokenizer, device)
-                print(f"Review {i+1} (key: {key}): {sentiment}")
-                results.append({'id': key, 'text': review_text, 'sentiment': sentiment})
-    
-    # Save the results to a new JSON file
-    output_file = os.path.join(DATA_DIR, os.path.basename(JSON_FILE).replace('.json', '_with_sentiment.json'))
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=4)
-    
-    print(f"Results saved to {output_file}")
-    
-    return results
\ No newline at end of file
+            chunk.append((label, review_id, review_text, review_item))
+            if len(chunk) >= chunk_size:
+                _classify_chunk(chunk, classify_texts, writer)
+                chunk = []
+        if chunk:
+            _classify_chunk(chunk, classify_texts, writer)
+
+    print(f"Results saved to {output_file} ({writer.count} reviews)")
+    return output_file
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from app.core.config import (
+    MODEL_PATH, SENTIMENT_CACHE_FILE, SENTIMENT_CACHE_MAX_ENTRIES, SENTIMENT_QUANTIZE,
+    SENTIMENT_BACKEND, SENTIMENT_ONNX_PATH
+)
+
+_checksum_lock = threading.Lock()
+_model_checksums = {}
+
+
+def model_checksum(model_path=MODEL_PATH):
+    """SHA-256 of the model weights, computed once per process"""
+    model_path = str(model_path)
+    with _checksum_lock:
+        if model_path not in _model_checksums:
+            digest = hashlib.sha256()
+            with open(model_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            _model_checksums[model_path] = digest.hexdigest()
+        return _model_checksums[model_path]
+
+
+def model_variant():
+    """How the model is run; variants can disagree on borderline reviews"""
+    if SENTIMENT_BACKEND == "onnx" and os.path.exists(SENTIMENT_ONNX_PATH):
+        return "onnx"
+    return "int8" if SENTIMENT_QUANTIZE else "fp32"
+
+
+def normalize_text(text):
+    # The IndoBERT tokenizer is uncased, so case and spacing do not change the prediction
+    return ' '.join(str(text).split()).lower()
+
+
+class SentimentCache:
+    """
+    SQLite cache of sentiment labels keyed by a hash of the normalized review text
+    and the model checksum. Entries are evicted least recently used first once the
+    cache holds more than `max_entries`.
+    """
+
+    def __init__(self, path=SENTIMENT_CACHE_FILE, max_entries=SENTIMENT_CACHE_MAX_ENTRIES, model_id=None):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._model_id = model_id
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " key TEXT PRIMARY KEY,"
+                " sentiment TEXT NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS predictions_last_access ON predictions (last_access)")
+
+    def _connect(self):
+        # One short-lived connection per call keeps the cache safe to use from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    @property
+    def model_id(self):
+        if self._model_id is None:
+            self._model_id = f"{model_checksum()}:{model_variant()}"
+        return self._model_id
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_id}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get_many(self, texts):
+        """Return {index: sentiment} for the texts that are cached"""
+        keys = [self.key(text) for text in texts]
+        found = {}
+        with self._connect() as conn:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, sentiment FROM predictions WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                conn.executemany("UPDATE predictions SET last_access = ? WHERE key = ?",
+                                 [(now, key) for key in found])
+
+        results = {i: found[key] for i, key in enumerate(keys) if key in found}
+        self.hits += len(results)
+        self.misses += len(keys) - len(results)
+        return results
+
+    def put_many(self, items):
+        """Store (text, sentiment) pairs in one transaction and evict if over the limit"""
+        now = time.time()
+        rows = [(self.key(text), sentiment, now) for text, sentiment in items if sentiment is not None]
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions (key, sentiment, last_access) VALUES (?, ?, ?)", rows
+            )
+            count = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM predictions WHERE key IN ("
+                    " SELECT key FROM predictions ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def stats(self):
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        return {"entries": entries, "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_sentiment_cache():
+    """Shared cache instance, created on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SentimentCache()
+        return _cache
@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+from app.core.config import STEM_CACHE_FILE
+from app.core.storage import save_json_atomic
+from app.ml.resources import sastrawi_resources
+
+
+class CachedStemmer:
+    """
+    Sastrawi stemming memoized per unique token and persisted across runs.
+
+    Reviews repeat a small vocabulary, so the rule-based stemmer only runs once per
+    new word; stem_many() stems the distinct unknown tokens of a whole batch and
+    maps every occurrence from the cache. Sastrawi itself is only loaded when a
+    token is not cached yet.
+    """
+
+    def __init__(self, path=STEM_CACHE_FILE):
+        self.path = str(path)
+        self.stems = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.stems = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not read stem cache from {self.path}: {e}")
+
+    def stem_many(self, tokens):
+        """Stem every token, running Sastrawi once per distinct token not seen before"""
+        unknown = {token for token in tokens if token not in self.stems}
+        if unknown:
+            stemmer, _ = sastrawi_resources.get()
+            stemmed = {token: stemmer.stem(token) for token in unknown}
+            with self._lock:
+                self.stems.update(stemmed)
+                self._dirty = True
+        with self._lock:
+            self.misses += len(unknown)
+            self.hits += len(tokens) - len(unknown)
+        return [self.stems[token] for token in tokens]
+
+    def stem(self, token):
+        return self.stem_many([token])[0]
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            save_json_atomic(self.path, self.stems, ensure_ascii=False)
+            self._dirty = False
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "vocabulary": len(self.stems),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None
+        }
+
+
+cached_stemmer = CachedStemmer()
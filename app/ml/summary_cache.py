@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from app.core.config import (
+    SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_ENTRIES, SUMMARY_MODEL_NAME, SUMMARY_CHUNK_TOKENS,
+    SUMMARY_PARTIAL_MAX_TOKENS, SUMMARY_FAN_IN, SUMMARY_MAX_DEPTH
+)
+from app.core.storage import save_json_atomic
+from app.ml.decoding import DECODING_PROFILES
+from app.ml.review_io import iter_review_records
+
+
+def summary_settings(profile, max_latency):
+    """Everything besides the reviews that changes the summary output"""
+    return {
+        "profile": profile,
+        "max_latency": max_latency,
+        "profiles": DECODING_PROFILES,
+        "model": SUMMARY_MODEL_NAME,
+        "chunk_tokens": SUMMARY_CHUNK_TOKENS,
+        "partial_max_tokens": SUMMARY_PARTIAL_MAX_TOKENS,
+        "fan_in": SUMMARY_FAN_IN,
+        "max_depth": SUMMARY_MAX_DEPTH
+    }
+
+
+class SummaryCache:
+    """
+    Summaries and keyword lists keyed by a fingerprint of their inputs.
+
+    The fingerprint hashes every review text with its sentiment label together with
+    the decoding settings, so a new scrape or different settings get a new entry
+    while unchanged inputs are served from memory. Entries are also written to
+    `directory` so they survive restarts; the oldest are removed beyond `max_entries`.
+    """
+
+    def __init__(self, directory=SUMMARY_CACHE_DIR, max_entries=SUMMARY_CACHE_MAX_ENTRIES):
+        self.directory = str(directory)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Input file path -> (mtime_ns, size, digest), so unchanged files are not re-read
+        self._input_digests = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _input_digest(self, path):
+        path = str(path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self._input_digests.get(path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+
+        digest = hashlib.sha256()
+        for _, text, record in iter_review_records(path):
+            sentiment = record.get('sentiment') if isinstance(record, dict) else None
+            digest.update(json.dumps([text, sentiment], ensure_ascii=False).encode('utf-8'))
+            digest.update(b'\n')
+        with self._lock:
+            self._input_digests[path] = (stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+        return digest.hexdigest()
+
+    def fingerprint(self, source_path, settings):
+        """Hash of the sentiment-labelled reviews in source_path and the summary settings"""
+        digest = hashlib.sha256(self._input_digest(source_path).encode('ascii'))
+        digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, fingerprint):
+        return os.path.join(self.directory, f"{fingerprint}.json")
+
+    def get(self, fingerprint):
+        with self._lock:
+            if fingerprint in self._entries:
+                self._entries.move_to_end(fingerprint)
+                self.hits += 1
+                return self._entries[fingerprint]
+        try:
+            with open(self._path(fingerprint), 'r', encoding='utf-8') as f:
+                output = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        self._remember(fingerprint, output)
+        with self._lock:
+            self.hits += 1
+        return output
+
+    def put(self, fingerprint, output):
+        save_json_atomic(self._path(fingerprint), output, ensure_ascii=False)
+        self._remember(fingerprint, output)
+        self._evict_files()
+
+    def _remember(self, fingerprint, output):
+        with self._lock:
+            self._entries[fingerprint] = output
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _evict_files(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.json')]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        return {
+            "entries_in_memory": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+summary_cache = SummaryCache()
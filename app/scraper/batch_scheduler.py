@@ -0,0 +1,95 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlparse
+from app.scraper.gmaps_scraper import scrape_gmaps_reviews
+
+
+class BatchScrapeScheduler:
+    """
+    Scrape many places concurrently on a shared browser pool.
+
+    At most `concurrency` places are scraped at once, scrapes against the same host
+    start at least `host_min_interval` seconds apart, and a failed place (including
+    one where no reviews could be collected) is retried up to `max_retries` times
+    with exponential backoff.
+    """
+
+    def __init__(self, browser_pool, concurrency=2, host_min_interval=2.0, max_retries=2, retry_backoff=5.0):
+        self.browser_pool = browser_pool
+        self.concurrency = concurrency
+        self.host_min_interval = host_min_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._host_locks = {}
+        self._host_last_start = {}
+
+    async def _wait_for_host_slot(self, url):
+        """Space out scrape start times per host"""
+        host = urlparse(url).netloc
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            elapsed = time.monotonic() - self._host_last_start.get(host, float('-inf'))
+            if elapsed < self.host_min_interval:
+                await asyncio.sleep(self.host_min_interval - elapsed)
+            self._host_last_start[host] = time.monotonic()
+
+    async def _scrape_place(self, semaphore, url, scrape_kwargs):
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        last_error = None
+        # Cancelling the task does not stop a scrape running in the executor; this does
+        stop_event = threading.Event()
+
+        for attempt in range(1, self.max_retries + 2):
+            async with semaphore:
+                await self._wait_for_host_slot(url)
+                scrape_info = {}
+                try:
+                    reviews = await loop.run_in_executor(
+                        None,
+                        lambda: scrape_gmaps_reviews(url, browser_pool=self.browser_pool, output_file=None,
+                                                     stop_event=stop_event, scrape_info=scrape_info,
+                                                     **scrape_kwargs)
+                    )
+                    return {
+                        "url": url,
+                        "status": "success",
+                        "attempts": attempt,
+                        "elapsed": round(time.monotonic() - started, 2),
+                        "review_count": len(reviews),
+                        "resource_report": scrape_info.get("resource_report"),
+                        "reviews": reviews
+                    }
+                except asyncio.CancelledError:
+                    stop_event.set()
+                    raise
+                except Exception as e:
+                    last_error = e
+                    print(f"Scrape of {url} failed on attempt {attempt}: {str(e)}")
+
+            if attempt <= self.max_retries:
+                # Back off outside the semaphore so other places can use the browser meanwhile
+                delay = self.retry_backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+                await asyncio.sleep(delay)
+
+        return {
+            "url": url,
+            "status": "error",
+            "attempts": self.max_retries + 1,
+            "elapsed": round(time.monotonic() - started, 2),
+            "message": str(last_error)
+        }
+
+    async def run(self, urls, **scrape_kwargs):
+        """Scrape every url and yield each place's result as soon as it completes"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.create_task(self._scrape_place(semaphore, url, scrape_kwargs)) for url in urls]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
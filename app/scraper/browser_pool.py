@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from app.scraper.gmaps_scraper import create_chrome_driver
+
+
+class PooledDriver:
+    """A Chrome driver plus the bookkeeping the pool needs to recycle it"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class BrowserPool:
+    """
+    Pool of pre-launched Chrome drivers shared across scrape requests.
+
+    At most `size` browsers exist at any time. A driver is recycled after
+    `max_pages_per_driver` leases, after `idle_timeout` seconds without use,
+    or when it fails a health check. Idle browsers past `idle_timeout` are also
+    quit by a background reaper, so an unused pool does not hold Chrome memory.
+    """
+
+    def __init__(self, size=2, max_pages_per_driver=20, idle_timeout=600,
+                 headless=True, chrome_binary_path=None, capture_network=False):
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.idle_timeout = idle_timeout
+        self.headless = headless
+        self.chrome_binary_path = chrome_binary_path
+        self.capture_network = capture_network
+
+        self._idle = deque()
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._reaper = None
+
+    def start(self, background=True):
+        """Pre-launch browsers until the pool is full"""
+        with self._condition:
+            if self._reaper is None and not self._closed:
+                self._reaper = threading.Thread(target=self._reap_idle, name="browser-pool-reaper", daemon=True)
+                self._reaper.start()
+        if background:
+            threading.Thread(target=self._warm_up, name="browser-pool-warmup", daemon=True).start()
+        else:
+            self._warm_up()
+
+    def _warm_up(self):
+        while True:
+            with self._condition:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            pooled = self._launch()
+            with self._condition:
+                if pooled is None:
+                    self._total -= 1
+                    return
+                if not self._closed:
+                    self._idle.append(pooled)
+                    self._condition.notify()
+                    continue
+                # The pool was closed while this browser was starting
+                self._total -= 1
+            self._quit(pooled)
+            return
+
+    def _reap_idle(self):
+        interval = max(1.0, min(self.idle_timeout / 2, 60.0))
+        while not self._stopped.wait(interval):
+            now = time.monotonic()
+            with self._condition:
+                expired = [pooled for pooled in self._idle if now - pooled.last_used > self.idle_timeout]
+                for pooled in expired:
+                    self._idle.remove(pooled)
+                self._total -= len(expired)
+                if expired:
+                    self._condition.notify_all()
+            for pooled in expired:
+                print("Quitting idle pooled browser")
+                self._quit(pooled)
+
+    def _launch(self):
+        try:
+            return PooledDriver(create_chrome_driver(self.headless, self.chrome_binary_path, self.capture_network))
+        except Exception as e:
+            print(f"Browser pool failed to launch Chrome: {str(e)}")
+            return None
+
+    def _is_healthy(self, pooled):
+        try:
+            return pooled.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def _is_expired(self, pooled):
+        return (pooled.pages >= self.max_pages_per_driver or
+                time.monotonic() - pooled.last_used > self.idle_timeout)
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        """Take a healthy driver out of the pool, launching one if there is room"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._total >= self.size and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a browser from the pool")
+                    self._condition.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+
+                pooled = self._idle.popleft() if self._idle else None
+                if pooled is None:
+                    self._total += 1
+
+            if pooled is None:
+                pooled = self._launch()
+                if pooled is None:
+                    self._discard()
+                    raise RuntimeError("Browser pool could not launch Chrome")
+                return pooled
+
+            if self._is_expired(pooled) or not self._is_healthy(pooled):
+                print("Recycling pooled browser")
+                self._quit(pooled)
+                self._discard()
+                continue
+            return pooled
+
+    def release(self, pooled, healthy=True):
+        """Give a driver back to the pool, recycling it if it is worn out"""
+        pooled.pages += 1
+        pooled.last_used = time.monotonic()
+
+        if healthy and not self._closed and pooled.pages < self.max_pages_per_driver:
+            try:
+                # Drop the previous page so an idle browser holds as little memory as possible
+                pooled.driver.get("about:blank")
+            except Exception:
+                healthy = False
+
+        if not healthy or self._closed or pooled.pages >= self.max_pages_per_driver:
+            self._quit(pooled)
+            self._discard()
+            if not self._closed:
+                # Replace the recycled browser in the background to keep the pool warm
+                self.start()
+            return
+
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def _discard(self):
+        with self._condition:
+            self._total -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager yielding a driver that is returned to the pool afterwards"""
+        pooled = self.acquire(timeout)
+        healthy = True
+        try:
+            yield pooled.driver
+        except Exception:
+            healthy = self._is_healthy(pooled)
+            raise
+        finally:
+            self.release(pooled, healthy)
+
+    def stats(self):
+        with self._condition:
+            return {"size": self.size, "launched": self._total, "idle": len(self._idle)}
+
+    def close(self):
+        """Quit every idle browser; leased ones are quit when they are released"""
+        with self._condition:
+            self._closed = True
+            self._stopped.set()
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+        print("Browser pool closed")
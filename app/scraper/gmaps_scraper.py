@@ -13,124 +13,215 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
-from app.core.config import DATA_DIR
+from app.core.config import DATA_DIR, BROWSER_POOL_LEASE_TIMEOUT, SCRAPER_BLOCK_PROFILE
+from app.scraper.page_scripts import (
+    EXTRACT_REVIEWS_JS, PENDING_REVIEWS_JS, MARK_REVIEW_DONE_JS, PAGE_SELECTORS, PAGE_CATCH_ALL_SELECTORS
+)
+from app.scraper.network_capture import NetworkReviewCapture
+from app.scraper.resource_blocking import ResourceBlocker
+from app.scraper.selector_registry import selector_registry
+from app.scraper.review_store import SeenReviewStore, review_signature
+from app.scraper.waits import wait_for_document_ready, wait_for_any, review_observer_state, wait_for_new_reviews
 
+# Star rating elements; Indonesian pages label them "5 bintang" rather than "5 stars"
+RATING_XPATH = ('.//span[@role="img" and (contains(@aria-label, "star") or contains(@aria-label, "bintang"))]'
+                ' | .//span[contains(@class, "kvMYJc")]')
+# Some review layouts show the rating as text, e.g. "4/5"
+RATING_TEXT_CSS = '.fzvQIb'
 
-class GoogleMapsMaxReviewScraper:
-    def __init__(self, headless=True, chrome_binary_path=None):
-        """Initialize the scraper with aggressive settings for max review collection"""
-        def create_options(version):
-            """Helper function to create fresh ChromeOptions"""
-            options = uc.ChromeOptions()
-            
-            # Set a realistic user agent
-            user_agent = f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{version}.0.0.0 Safari/537.36'
-            options.add_argument(f'--user-agent={user_agent}')
-            
-            # Add arguments to improve performance and avoid detection
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_argument('--disable-infobars')
-            options.add_argument('--disable-notifications')
-            options.add_argument('--disable-extensions')
-            options.add_argument('--disable-popup-blocking')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--lang=id')
-            options.add_argument('--lang=ID')
-            options.add_argument('--accept-lang=id-ID,id')
-            
-            # Configure chrome binary if provided
-            if chrome_binary_path:
-                if os.path.exists(chrome_binary_path):
-                    print(f"Using Chrome binary at: {chrome_binary_path}")
-                    options.binary_location = chrome_binary_path
-                else:
-                    print(f"Warning: Chrome binary not found at {chrome_binary_path}")
-                    # Try to find Chrome in common locations
-                    common_locations = [
-                        '/usr/bin/google-chrome',
-                        '/usr/bin/google-chrome-stable',
-                        '/mnt/c/Program Files/Google/Chrome/Application/chrome.exe',
-                        '/mnt/c/Program Files (x86)/Google/Chrome/Application/chrome.exe'
-                    ]
-                    for location in common_locations:
-                        if os.path.exists(location):
-                            print(f"Found Chrome at: {location}")
-                            options.binary_location = location
-                            break
-            
-            return options
+
+def parse_rating(label):
+    """Return the 1-5 rating in an aria-label or text like "5 bintang", "4,0 stars" or "4/5", else 0.0"""
+    if not label:
+        return 0.0
+    match = re.search(r'\d+(?:[.,]\d+)?', label)
+    if not match:
+        return 0.0
+    rating = float(match.group(0).replace(',', '.'))
+    return rating if 1.0 <= rating <= 5.0 else 0.0
+
+
+def create_chrome_driver(headless=True, chrome_binary_path=None, capture_network=False):
+    """
+    Launch Chrome, trying version 136, then 135, then the default version.
+
+    With capture_network=True the performance log is enabled so network responses
+    can be read back through the DevTools Protocol.
+    """
+    def create_options(version):
+        """Helper function to create fresh ChromeOptions"""
+        options = uc.ChromeOptions()
         
+        # Set a realistic user agent
+        user_agent = f'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{version}.0.0.0 Safari/537.36'
+        options.add_argument(f'--user-agent={user_agent}')
+        
+        # Add arguments to improve performance and avoid detection
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_argument('--disable-infobars')
+        options.add_argument('--disable-notifications')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-popup-blocking')
+        options.add_argument('--window-size=1920,1080')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--lang=id')
+        options.add_argument('--lang=ID')
+        options.add_argument('--accept-lang=id-ID,id')
+
+        if capture_network:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
+        # Configure chrome binary if provided
+        if chrome_binary_path:
+            if os.path.exists(chrome_binary_path):
+                print(f"Using Chrome binary at: {chrome_binary_path}")
+                options.binary_location = chrome_binary_path
+            else:
+                print(f"Warning: Chrome binary not found at {chrome_binary_path}")
+                # Try to find Chrome in common locations
+                common_locations = [
+                    '/usr/bin/google-chrome',
+                    '/usr/bin/google-chrome-stable',
+                    '/mnt/c/Program Files/Google/Chrome/Application/chrome.exe',
+                    '/mnt/c/Program Files (x86)/Google/Chrome/Application/chrome.exe'
+                ]
+                for location in common_locations:
+                    if os.path.exists(location):
+                        print(f"Found Chrome at: {location}")
+                        options.binary_location = location
+                        break
+        
+        return options
+    
+    try:
+        # First attempt with Chrome 136
+        print("Attempting to start Chrome with version 136...")
+        options = create_options(136)
+        driver = uc.Chrome(
+            options=options,
+            headless=headless,
+            use_subprocess=True,
+            version_main=136
+        )
+        print("Successfully started Chrome with version 136")
+    except Exception as e:
+        print(f"Error starting Chrome 136: {str(e)}")
+        print("\nTrying with Chrome 135...")
         try:
-            # First attempt with Chrome 136
-            print("Attempting to start Chrome with version 136...")
-            options = create_options(136)
-            self.driver = uc.Chrome(
+            # Second attempt with Chrome 135
+            options = create_options(135)  # Create fresh options for version 135
+            options.add_argument('--no-first-run')
+            options.add_argument('--no-service-autorun')
+            options.add_argument('--password-store=basic')
+            driver = uc.Chrome(
                 options=options,
                 headless=headless,
                 use_subprocess=True,
-                version_main=136
+                version_main=135
             )
-            print("Successfully started Chrome with version 136")
-        except Exception as e:
-            print(f"Error starting Chrome 136: {str(e)}")
-            print("\nTrying with Chrome 135...")
+            print("Successfully started Chrome with version 135")
+        except Exception as e2:
+            print(f"Error starting Chrome 135: {str(e2)}")
+            print("\nTrying one last time with default version...")
             try:
-                # Second attempt with Chrome 135
-                options = create_options(135)  # Create fresh options for version 135
-                options.add_argument('--no-first-run')
-                options.add_argument('--no-service-autorun')
-                options.add_argument('--password-store=basic')
-                self.driver = uc.Chrome(
+                # Final attempt with default version
+                options = create_options(135)  # Create fresh options again
+                driver = uc.Chrome(
                     options=options,
                     headless=headless,
-                    use_subprocess=True,
-                    version_main=135
+                    use_subprocess=True
                 )
-                print("Successfully started Chrome with version 135")
-            except Exception as e2:
-                print(f"Error starting Chrome 135: {str(e2)}")
-                print("\nTrying one last time with default version...")
-                try:
-                    # Final attempt with default version
-                    options = create_options(135)  # Create fresh options again
-                    self.driver = uc.Chrome(
-                        options=options,
-                        headless=headless,
-                        use_subprocess=True
-                    )
-                    print("Successfully started Chrome with default version")
-                except Exception as e3:
-                    print("All Chrome initialization attempts failed.")
-                    print(f"Final error: {str(e3)}")
-                    raise
-        
-        # Set up wait and maximize window
+                print("Successfully started Chrome with default version")
+            except Exception as e3:
+                print("All Chrome initialization attempts failed.")
+                print(f"Final error: {str(e3)}")
+                raise
+
+    driver.maximize_window()
+    return driver
+
+
+class GoogleMapsMaxReviewScraper:
+    def __init__(self, headless=True, chrome_binary_path=None, driver=None, capture_network=False):
+        """
+        Initialize the scraper with aggressive settings for max review collection
+
+        Args:
+            headless: Run Chrome without a visible window
+            chrome_binary_path: Optional path to the Chrome binary
+            driver: Already running driver (e.g. leased from a BrowserPool); it is not
+                quit by close() because its owner manages its lifetime
+            capture_network: Enable the performance log needed by extraction_mode="network"
+        """
+        self.owns_driver = driver is None
+        self.last_resource_report = None
+        # True if the last iter_reviews run stopped at a review known from a previous scrape
+        self.last_reached_known = False
+        self.driver = driver or create_chrome_driver(headless, chrome_binary_path, capture_network)
+
+        # Set up wait
         self.wait = WebDriverWait(self.driver, 30)
-        self.driver.maximize_window()
         print("Browser setup completed successfully")
 
-    def scrape_reviews(self, place_url, target_reviews=50, max_wait_time=5, max_scroll_attempts=30):
+    def scrape_reviews(self, place_url, target_reviews=50, **kwargs):
         """
         Main method to scrape reviews using a simplified approach
+
+        Takes the same arguments as iter_reviews and returns the collected reviews as a list.
+        """
+        return list(self.iter_reviews(place_url, target_reviews=target_reviews, **kwargs))
+
+    def iter_reviews(self, place_url, target_reviews=50, max_wait_time=5, max_scroll_attempts=30,
+                     extraction_mode="page", newest_first=False, known_reviews=None,
+                     block_profile=SCRAPER_BLOCK_PROFILE, stop_event=None):
+        """
+        Scrape reviews, yielding each one as soon as it is extracted
         
         Args:
             place_url: URL of the Google Maps place
             target_reviews: Desired number of reviews to collect
             max_wait_time: Maximum seconds to wait between scrolls
             max_scroll_attempts: Maximum scroll attempts before giving up
+            extraction_mode: "page" reads all visible reviews with one in-page script per
+                scroll, "element" inspects each review element through WebDriver, "network"
+                parses the review RPC responses the page fetches (needs a driver created
+                with capture_network=True)
+            newest_first: Sort the reviews by newest before collecting
+            known_reviews: Optional SeenReviewStore. With newest_first, collection keeps
+                going past target_reviews and stops at the first review it already knows
+                (unless the store is empty); if the newest sort cannot be applied, known
+                reviews are only skipped
+            block_profile: Resource blocking profile from BLOCK_PROFILES ("review_text"
+                blocks map tiles, photos, fonts and video; "none" loads everything)
+            stop_event: Optional threading.Event; once set, collection ends before the
+                next scroll pass (e.g. when the client that asked for the scrape is gone)
         
-        Returns:
-            List of review dictionaries
+        Yields:
+            Review dictionaries, at most target_reviews of them unless stopping at known reviews
         """
         print(f"Starting review collection for: {place_url}")
+        self.last_reached_known = False
+
+        network_capture = None
+        if extraction_mode == "network":
+            network_capture = NetworkReviewCapture(self.driver)
+            if network_capture.is_available():
+                network_capture.reset()
+            else:
+                print("Network capture is not enabled for this browser, using page extraction")
+                extraction_mode = "page"
         
+        # Block heavy resources before the page starts loading
+        resource_blocker = ResourceBlocker(block_profile)
+        resource_blocker.apply(self.driver)
+
         # Navigate to the place
         print("Navigating to URL...")
         self.driver.get(place_url)
         print("URL loaded, waiting for page to initialize...")
-        time.sleep(5)
+        wait_for_document_ready(self.driver, timeout=5)
+        wait_for_any(self.driver, ['button[role="tab"]', 'div[data-review-id]'], timeout=5)
         
         # Simple cookie acceptance
         try:
@@ -140,7 +231,7 @@ class GoogleMapsMaxReviewScraper:
                 if button.is_displayed():
                     button.click()
                     print("Accepted cookies")
-                    time.sleep(2)
+                    wait_for_any(self.driver, ['button[role="tab"]'], timeout=2)
                     break
         except:
             print("No cookie dialog found or already accepted")
@@ -208,13 +299,11 @@ class GoogleMapsMaxReviewScraper:
                     print(f"Attempting to click tab with aria-label='{aria_label}', text='{tab_text}'")
                     
                     # Force tab into view and try both JS and normal click
-                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", tab)
-                    time.sleep(1)
+                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tab)
                     
                     # Try JavaScript click first
                     self.driver.execute_script("arguments[0].click();", tab)
                     print("Used JavaScript click on tab")
-                    time.sleep(3)
                     
                     # If JS click might not have worked, try normal click
                     try:
@@ -224,7 +313,7 @@ class GoogleMapsMaxReviewScraper:
                         pass
                         
                     review_tab_found = True
-                    time.sleep(5)  # Wait for reviews to load
+                    wait_for_any(self.driver, ['div[data-review-id]'], timeout=8)  # Wait for reviews to load
                     break
                 except Exception as e:
                     print(f"Failed to click tab: {str(e)}, trying next one")
@@ -242,7 +331,7 @@ class GoogleMapsMaxReviewScraper:
                     reviews_url += 'reviews'
                     print(f"Attempting to navigate directly to: {reviews_url}")
                     self.driver.get(reviews_url)
-                    time.sleep(5)
+                    wait_for_any(self.driver, ['div[data-review-id]'], timeout=5)
                     review_tab_found = True
                 elif 'maps.app.goo.gl' in place_url:
                     # Try getting the shortened URL and modifying it
@@ -256,7 +345,7 @@ class GoogleMapsMaxReviewScraper:
                         reviews_url = f"https://www.google.com/maps/place/{place_name}/{place_id}/reviews"
                         print(f"Constructed reviews URL: {reviews_url}")
                         self.driver.get(reviews_url)
-                        time.sleep(5)
+                        wait_for_any(self.driver, ['div[data-review-id]'], timeout=5)
                         review_tab_found = True
                 
                 # One more attempt - try to use the UI to find reviews
@@ -268,9 +357,9 @@ class GoogleMapsMaxReviewScraper:
                     for rating in rating_elements:
                         try:
                             print("Trying to click on rating element")
-                            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", rating)
+                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", rating)
                             self.driver.execute_script("arguments[0].click();", rating)
-                            time.sleep(5)
+                            wait_for_any(self.driver, ['div[data-review-id]'], timeout=5)
                             # Check if this got us to reviews
                             if self.driver.find_elements(By.XPATH, "//div[contains(@data-review-id, '')]"):
                                 print("Successfully navigated to reviews by clicking rating")
@@ -335,8 +424,18 @@ class GoogleMapsMaxReviewScraper:
         
         if not reviews_found:
             print("No reviews found after navigation attempts")
-            return []
+            return
         
+        stop_at_known = False
+        if newest_first:
+            stop_at_known = self._sort_reviews_newest()
+            if not stop_at_known and known_reviews is not None:
+                print("Reviews are not sorted by newest, so known reviews are skipped instead of ending collection")
+        stop_at_known = stop_at_known and known_reviews is not None
+
+        # When stopping at known reviews, everything newer than them is collected
+        limit = float('inf') if stop_at_known and len(known_reviews) else target_reviews
+
         print("Starting to collect reviews...")
         
         all_reviews = []
@@ -372,6 +471,12 @@ class GoogleMapsMaxReviewScraper:
                         (By.CSS_SELECTOR, 'div[role="main"]')
                     ]
                     
+                    # Try the container locator that worked in earlier runs first. Every ancestor
+                    # of a review matches the parent XPath, outermost first, so like the last two
+                    # it always hits and is only tried after the specific ones
+                    review_containers = selector_registry.ordered(
+                        'review_container', review_containers,
+                        catch_all=[review_containers[1]] + review_containers[-2:])
                     for locator_type, locator in review_containers:
                         try:
                             elements = self.driver.find_elements(locator_type, locator)
@@ -391,6 +496,7 @@ class GoogleMapsMaxReviewScraper:
                                                 break
                                     except:
                                         continue
+                            selector_registry.record('review_container', (locator_type, locator), scroller is not None)
                             if scroller:
                                 break
                         except:
@@ -408,9 +514,21 @@ class GoogleMapsMaxReviewScraper:
                 # Store all review data to avoid duplicates 
                 seen_review_ids = set()
                 seen_review_texts = set()
+
+                # Watch the page for appended reviews so waits end as soon as content arrives
+                try:
+                    observed_reviews = review_observer_state(self.driver)["added"]
+                except Exception as e:
+                    print(f"Could not install review observer: {str(e)}")
+                    observed_reviews = 0
+                # Observer count at the last extraction, to tell whether reviews arrived since
+                extracted_at_count = observed_reviews
                 
                 # Main scrolling loop
-                while len(all_reviews) < target_reviews and scroll_attempts < max_scroll_attempts:
+                while len(all_reviews) < limit and scroll_attempts < max_scroll_attempts:
+                    if stop_event is not None and stop_event.is_set():
+                        print("Scrape cancelled, ending collection")
+                        break
                     scroll_attempts += 1
                     
                     # Before scrolling, get current scroll position
@@ -457,8 +575,8 @@ class GoogleMapsMaxReviewScraper:
                             # Send Page Down key multiple times
                             actions = ActionChains(self.driver)
                             for _ in range(3):
-                                actions.send_keys(Keys.PAGE_DOWN).perform()
-                                time.sleep(0.3)
+                                actions.send_keys(Keys.PAGE_DOWN)
+                            actions.perform()
                             scroll_worked = True
                             print("Scrolled using PAGE_DOWN keys")
                         except Exception as e:
@@ -478,111 +596,112 @@ class GoogleMapsMaxReviewScraper:
                         except Exception as e:
                             print(f"Method 4 scroll failed: {str(e)}")
                     
-                    # Give time for new content to load
-                    print(f"Waiting {max_wait_time}s for content to load...")
-                    time.sleep(max_wait_time)
+                    # Give time for new content to load, returning as soon as it has arrived
+                    print(f"Waiting up to {max_wait_time}s for content to load...")
+                    observed_reviews = wait_for_new_reviews(self.driver, observed_reviews, max_wait_time) or observed_reviews
                     
                     # After scrolling, expand any "More" buttons to see full review text
-                    try:
-                        more_buttons = self.driver.find_elements(By.XPATH, 
-                            '//button[contains(., "More") or contains(., "more") or contains(., "Lainnya")]')
+                    # (page and network extraction do not need the extra clicks)
+                    if extraction_mode == "element":
+                        try:
+                            more_buttons = self.driver.find_elements(By.XPATH, 
+                                '//button[contains(., "More") or contains(., "more") or contains(., "Lainnya")]')
                         
-                        expanded = 0
-                        for button in more_buttons[:7]:  # Process more buttons per scroll
-                            if button.is_displayed():
-                                try:
-                                    # Scroll to make sure button is in view
-                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                                    time.sleep(0.2)
-                                    
-                                    # Try JavaScript click - more reliable
-                                    self.driver.execute_script("arguments[0].click();", button)
-                                    expanded += 1
-                                    time.sleep(0.3)
-                                except:
+                            expanded = 0
+                            for button in more_buttons[:7]:  # Process more buttons per scroll
+                                if button.is_displayed():
                                     try:
-                                        button.click()
+                                        # Scroll to make sure button is in view
+                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
+                                        time.sleep(0.2)
+                                    
+                                        # Try JavaScript click - more reliable
+                                        self.driver.execute_script("arguments[0].click();", button)
                                         expanded += 1
                                         time.sleep(0.3)
                                     except:
-                                        pass
+                                        try:
+                                            button.click()
+                                            expanded += 1
+                                            time.sleep(0.3)
+                                        except:
+                                            pass
                         
-                        if expanded > 0:
-                            print(f"Expanded {expanded} review text(s)")
-                    except Exception as e:
-                        print(f"Error expanding reviews: {str(e)}")
+                            if expanded > 0:
+                                print(f"Expanded {expanded} review text(s)")
+                        except Exception as e:
+                            print(f"Error expanding reviews: {str(e)}")
                         
                     # Random delay to avoid detection
                     random_delay = 0.5 + (random.random() * 1.0)
                     time.sleep(random_delay)
                     
                     # Now find and process all visible reviews
-                    review_elements = []
-                    
-                    # Try multiple selectors to find reviews
-                    try:
-                        # First try data-review-id attribute
-                        review_elements = self.driver.find_elements(By.CSS_SELECTOR, 'div[data-review-id]')
-                        print(f"Found {len(review_elements)} reviews with data-review-id")
-                        
-                        # If too few, try looking for reviews by structure
-                        if len(review_elements) < 5:
-                            star_reviews = self.driver.find_elements(By.XPATH, 
-                                '//div[.//span[contains(@aria-label, "stars")] and .//div[contains(@class, "fontBodyMedium")]]')
-                            
-                            if len(star_reviews) > len(review_elements):
-                                review_elements = star_reviews
-                                print(f"Found {len(review_elements)} reviews with stars and text")
-                    except Exception as e:
-                        print(f"Error finding reviews: {str(e)}")
-                    
-                    # Process reviews
                     new_reviews = 0
-                    if review_elements:
-                        for element in review_elements:
-                            try:
-                                # Generate a unique ID for this review
-                                review_id = element.get_attribute('data-review-id')
-                                if not review_id:
-                                    try:
-                                        # Create a position-based ID if attribute not available
-                                        reviewer_element = element.find_element(By.XPATH, './/div[contains(@class, "fontHeadlineSmall")]')
-                                        reviewer_name = reviewer_element.text.strip()
-                                        review_id = f"pos_{reviewer_name}_{review_elements.index(element)}"
-                                    except:
-                                        review_id = f"pos_{review_elements.index(element)}"
-                                
-                                # Skip if already processed
-                                if review_id in seen_review_ids:
-                                    continue
-                                
-                                # Extract the review data
-                                review_data = self._extract_review_data(element)
-                                if review_data:
-                                    # Mark as seen using both ID and content signature
-                                    seen_review_ids.add(review_id)
-                                    
-                                    # Create a signature based on reviewer name and text 
-                                    review_text = review_data.get('review_text', '').strip()
-                                    review_signature = f"{review_data.get('reviewer_name')}:{review_text[:50]}"
-                                    
-                                    if review_signature not in seen_review_texts:
-                                        seen_review_texts.add(review_signature)
-                                        all_reviews.append(review_data)
-                                        new_reviews += 1
-                                        
-                                        # Update progress bar
-                                        if len(all_reviews) > pbar.n:
-                                            pbar.update(len(all_reviews) - pbar.n)
-                                        
-                                        if len(all_reviews) >= target_reviews:
-                                            break
-                            except Exception as e:
-                                print(f"Error processing review: {str(e)}")
-                                continue
+                    if extraction_mode == "network":
+                        candidates = [(review_id, self._finalize_review_data(review_data))
+                                      for review_id, review_data in network_capture.read_reviews()]
+                        if not candidates and not all_reviews:
+                            # The first reviews can arrive embedded in the page rather than via RPC
+                            candidates = self.extract_visible_reviews() or []
+                        elif not candidates and observed_reviews > extracted_at_count:
+                            # Reviews were rendered but none could be parsed from the RPC responses,
+                            # e.g. because Maps changed the payload layout
+                            print(f"Warning: {observed_reviews - extracted_at_count} new reviews appeared but no "
+                                  f"review RPC response could be parsed; reading them from the page instead")
+                            candidates = self.extract_visible_reviews() or []
+                        extracted_at_count = observed_reviews
+                    if extraction_mode == "page":
+                        candidates = self.extract_visible_reviews()
+                        if candidates is None:
+                            print("In-page extraction failed, falling back to element mode")
+                            extraction_mode = "element"
+                    if extraction_mode == "element":
+                        candidates = self._iter_element_reviews(seen_review_ids)
+
+                    reached_known = False
+                    for review_id, review_data in candidates:
+                        # Skip if already processed
+                        if review_id in seen_review_ids:
+                            continue
+                        if not review_data:
+                            continue
+
+                        if known_reviews is not None and known_reviews.is_known(review_id, review_data):
+                            if stop_at_known:
+                                # Everything after a review from a previous scrape is older, so stop here
+                                reached_known = True
+                                break
+                            seen_review_ids.add(review_id)
+                            continue
+
+                        # Mark as seen using both ID and content signature
+                        seen_review_ids.add(review_id)
+
+                        # Create a signature based on reviewer name and text
+                        signature = review_signature(review_data)
+
+                        if signature not in seen_review_texts:
+                            seen_review_texts.add(signature)
+                            review_data['review_id'] = review_id
+                            all_reviews.append(review_data)
+                            new_reviews += 1
+                            yield review_data
+
+                            # Update progress bar
+                            if len(all_reviews) > pbar.n:
+                                pbar.update(len(all_reviews) - pbar.n)
+
+                            if len(all_reviews) >= limit:
+                                break
                     
                     # Report progress
                     print(f"Found {new_reviews} new reviews, total now: {len(all_reviews)}")
+
+                    if reached_known:
+                        print("Reached a previously scraped review, ending collection")
+                        self.last_reached_known = True
+                        break
                     
                     # Check if we've made progress
                     if new_reviews > 0:
@@ -595,17 +714,16 @@ class GoogleMapsMaxReviewScraper:
                     if consecutive_no_new_reviews >= 2:
                         try:
                             print("Trying aggressive scrolling...")
-                            # Try scrolling to the bottom
-                            self.driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", scroller)
-                            time.sleep(2)
-                            
-                            # Then scroll back up a bit to trigger loading
-                            self.driver.execute_script("arguments[0].scrollBy(0, -300);", scroller)
-                            time.sleep(2)
-                            
-                            # Then down again
-                            self.driver.execute_script("arguments[0].scrollBy(0, 500);", scroller)
-                            time.sleep(2)
+                            # Try scrolling to the bottom, then back up a bit and down again
+                            # to trigger loading; stop as soon as new reviews arrive
+                            for script in ["arguments[0].scrollTo(0, arguments[0].scrollHeight);",
+                                           "arguments[0].scrollBy(0, -300);",
+                                           "arguments[0].scrollBy(0, 500);"]:
+                                self.driver.execute_script(script, scroller)
+                                loaded = wait_for_new_reviews(self.driver, observed_reviews, 2)
+                                if loaded:
+                                    observed_reviews = loaded
+                                    break
                         except Exception as e:
                             print(f"Aggressive scroll failed: {str(e)}")
                     
@@ -621,7 +739,6 @@ class GoogleMapsMaxReviewScraper:
                                 "el.click(); " +
                                 "document.body.removeChild(el);"
                             )
-                            time.sleep(1)
                             
                             # Try refreshing the scroller reference
                             try:
@@ -651,7 +768,142 @@ class GoogleMapsMaxReviewScraper:
             print("Saving reviews collected so far...")
         
         print(f"Finished review collection. Found {len(all_reviews)} unique reviews.")
-        return all_reviews[:target_reviews]
+        selector_registry.save()
+        self.last_resource_report = resource_blocker.report(self.driver)
+
+    def _sort_reviews_newest(self):
+        """Switch the reviews list to newest first; returns True if the sort was applied"""
+        try:
+            sort_buttons = self.driver.find_elements(By.XPATH,
+                "//button[contains(@aria-label, 'Sort') or contains(@aria-label, 'Urutkan')]")
+            for button in sort_buttons:
+                if not button.is_displayed():
+                    continue
+                self.driver.execute_script("arguments[0].click();", button)
+                if not wait_for_any(self.driver, ['div[role="menuitemradio"]'], timeout=3):
+                    continue
+
+                options = self.driver.find_elements(By.XPATH,
+                    "//div[@role='menuitemradio'][contains(., 'Newest') or contains(., 'Terbaru')]")
+                if not options:
+                    # The second option is "Newest" in every locale we have seen
+                    options = self.driver.find_elements(By.CSS_SELECTOR, 'div[role="menuitemradio"]')[1:2]
+                if options:
+                    old_reviews = self.driver.find_elements(By.CSS_SELECTOR, 'div[data-review-id]')[:1]
+                    self.driver.execute_script("arguments[0].click();", options[0])
+                    if old_reviews:
+                        # The reviews already on screen are in the old order; wait until they
+                        # are replaced so none of them is taken for the newest
+                        try:
+                            WebDriverWait(self.driver, 10).until(EC.staleness_of(old_reviews[0]))
+                        except TimeoutException:
+                            print("Review list did not reload after sorting, keeping default review order")
+                            return False
+                    wait_for_any(self.driver, ['div[data-review-id]'], timeout=5)
+                    print("Sorted reviews by newest")
+                    return True
+        except Exception as e:
+            print(f"Could not sort reviews by newest: {str(e)}")
+
+        print("Sort menu not found, keeping default review order")
+        return False
+
+    def extract_visible_reviews(self):
+        """
+        Extract the visible reviews loaded since the previous call with a single
+        execute_script call. A page-side cursor marks processed nodes, so each call only
+        touches newly appended reviews.
+
+        Works on any loaded page, including saved HTML loaded via file://.
+
+        Returns:
+            List of (review_id, review_data) tuples, or None if the script failed
+        """
+        selectors = {group: selector_registry.ordered(group, locators, PAGE_CATCH_ALL_SELECTORS.get(group, ()))
+                     for group, locators in PAGE_SELECTORS.items()}
+        try:
+            raw = self.driver.execute_script(EXTRACT_REVIEWS_JS, None, selectors)
+            result = json.loads(raw)
+        except Exception as e:
+            print(f"Error running in-page extraction: {str(e)}")
+            return None
+
+        for group, stats in result['selectorStats'].items():
+            for selector, counts in stats.items():
+                selector_registry.record(group, selector, None, tries=counts['tries'], hits=counts['hits'])
+
+        extracted = result['reviews']
+        print(f"Extracted {len(extracted)} new reviews in page")
+        results = []
+        for item in extracted:
+            review_id = item.pop('review_id')
+            review_data = self._finalize_review_data(item)
+            results.append((review_id, review_data))
+        return results
+
+    def _iter_element_reviews(self, seen_review_ids=()):
+        """Find newly loaded review elements and extract each one through WebDriver calls"""
+        claimed = []
+        # Only nodes found through data-review-id can be marked in the page
+        marked_in_page = True
+
+        try:
+            # Only the review nodes not extracted in a previous pass
+            cursor = self.driver.execute_script(PENDING_REVIEWS_JS)
+            claimed = [(element, review_id) for element, review_id in cursor['pending']]
+            print(f"Found {len(claimed)} pending reviews with data-review-id ({cursor['done']} done)")
+
+            # If the page has no review ids at all, look for reviews by structure
+            if not claimed and cursor['done'] == 0:
+                marked_in_page = False
+                star_reviews = self.driver.find_elements(By.XPATH,
+                    '//div[.//span[contains(@aria-label, "stars")] and .//div[contains(@class, "fontBodyMedium")]]')
+                print(f"Found {len(star_reviews)} reviews with stars and text")
+
+                for index, element in enumerate(star_reviews):
+                    try:
+                        # Create a position-based ID since the attribute is not available
+                        reviewer_element = element.find_element(By.XPATH, './/div[contains(@class, "fontHeadlineSmall")]')
+                        reviewer_name = reviewer_element.text.strip()
+                        review_id = f"pos_{reviewer_name}_{index}"
+                    except:
+                        review_id = f"pos_{index}"
+                    claimed.append((element, review_id))
+        except Exception as e:
+            print(f"Error finding reviews: {str(e)}")
+
+        for element, review_id in claimed:
+            # Skip if already processed
+            if review_id in seen_review_ids:
+                continue
+
+            try:
+                review_data = self._extract_review_data(element)
+            except Exception as e:
+                print(f"Error processing review: {str(e)}")
+                continue
+            if review_data and marked_in_page:
+                # Only now is the node done; a failed extraction is retried next pass
+                try:
+                    self.driver.execute_script(MARK_REVIEW_DONE_JS, element, review_id)
+                except Exception as e:
+                    print(f"Could not mark review {review_id} as done: {str(e)}")
+            yield review_id, review_data
+
+    def _finalize_review_data(self, review_data):
+        """Apply the shared defaults and filters to an extracted review"""
+        if not review_data.get('review_text') and len(review_data.get('date', '')) > 50:
+            review_data['review_text'] = review_data['date']
+            review_data['date'] = "Unknown Date"
+
+        review_data['review_text'] = review_data.get('review_text') or "No review text found"
+
+        # Skip reviews without meaningful content
+        if review_data['review_text'] == "No review text found" and review_data['rating'] == 0.0:
+            print("Skipping review with no meaningful content")
+            return None
+
+        return review_data
 
     def _extract_review_data(self, review_element):
         """Extract data from a review element using a simplified approach"""
@@ -665,33 +917,36 @@ class GoogleMapsMaxReviewScraper:
                 
             # Extract reviewer name (simplified)
             reviewer_name = "Unknown Reviewer"
-            try:
-                name_elements = review_element.find_elements(By.XPATH, './/div[contains(@class, "fontHeadlineSmall")]')
-                if not name_elements:
-                    name_elements = review_element.find_elements(By.XPATH, './/div[contains(@class, "fontTitleLarge")]')
-                if not name_elements:
-                    name_elements = review_element.find_elements(By.XPATH, './/div[contains(@class, "d4r55")]')
-                
-                for element in name_elements:
+            name_selectors = [
+                './/div[contains(@class, "fontHeadlineSmall")]',
+                './/div[contains(@class, "fontTitleLarge")]',
+                './/div[contains(@class, "d4r55")]',
+            ]
+
+            def find_name(selector):
+                for element in review_element.find_elements(By.XPATH, selector):
                     if element.is_displayed() and element.text.strip():
-                        reviewer_name = element.text.strip()
-                        break
-            except:
-                pass
+                        return element.text.strip()
+                return None
+
+            # The typography classes match other text too, so they stay behind d4r55
+            _, name = selector_registry.first_match('name', name_selectors, find_name, catch_all=name_selectors[:2])
+            if name:
+                reviewer_name = name
             
-            # Extract rating (simplified)
+            # Extract rating
             rating_value = 0.0
             try:
-                star_elements = review_element.find_elements(By.XPATH, './/span[contains(@aria-label, "star") or contains(@aria-label, "stars")]')
-                for star in star_elements:
-                    if star.is_displayed():
-                        aria_label = star.get_attribute('aria-label')
-                        if aria_label:
-                            # Extract digits from aria-label
-                            digits = re.findall(r'\d+[,.]?\d*', aria_label.replace(',', '.'))
-                            if digits:
-                                rating_value = float(digits[0])
-                                break
+                # The star row is an image, so it is not required to be displayed
+                for star in review_element.find_elements(By.XPATH, RATING_XPATH):
+                    rating_value = parse_rating(star.get_attribute('aria-label'))
+                    if rating_value:
+                        break
+                if not rating_value:
+                    for element in review_element.find_elements(By.CSS_SELECTOR, RATING_TEXT_CSS):
+                        rating_value = parse_rating(element.text)
+                        if rating_value:
+                            break
             except:
                 pass
             
@@ -722,6 +977,8 @@ class GoogleMapsMaxReviewScraper:
             
             # Save all potential text elements to check later
             potential_text_elements = []
+            # (selector, hit) per text selector tried; recorded once we know the review has text
+            text_tries = []
             
             try:
                 # Find the main text content by class and content
@@ -734,8 +991,12 @@ class GoogleMapsMaxReviewScraper:
                     './/div[@data-js-log-root]',  # Root review element
                 ]
                 
-                # First try specific review text selectors
-                for selector in text_selectors:
+                # First try specific review text selectors, historically best first (the
+                # two catch-alls always last), stopping at the first one that yields real
+                # review text
+                for selector in selector_registry.ordered('text', text_selectors, catch_all=text_selectors[-2:]):
+                    if review_text:
+                        break
                     text_elements = review_element.find_elements(By.XPATH, selector)
                     for element in text_elements:
                         if element.is_displayed():
@@ -748,6 +1009,7 @@ class GoogleMapsMaxReviewScraper:
                                 if len(text) > 20 and not text.endswith('ago') and not any(month in text.lower() for month in ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']):
                                     if len(text) > len(review_text):
                                         review_text = text
+                    text_tries.append((selector, bool(review_text)))
                 
                 # If no specific review text found, look at all text in the review
                 if not review_text and potential_text_elements:
@@ -786,6 +1048,11 @@ class GoogleMapsMaxReviewScraper:
                         review_text = max(cleaned_lines, key=len)
             except Exception as e:
                 print(f"Error extracting review text: {str(e)}")
+
+            # Rating-only reviews have no text to find, so they say nothing about the selectors
+            if review_text:
+                for selector, hit in text_tries:
+                    selector_registry.record('text', selector, hit)
             
             # Extract date (separate pass)
             date = "Unknown Date"
@@ -798,9 +1065,8 @@ class GoogleMapsMaxReviewScraper:
                     './/div[contains(@class, "fontBodySmall") and (contains(text(), "ago") or contains(text(), "/") or contains(text(), "-"))]'  # Small text with date indicators
                 ]
                 
-                for selector in date_selectors:
-                    date_elements = review_element.find_elements(By.XPATH, selector)
-                    for element in date_elements:
+                def find_date(selector):
+                    for element in review_element.find_elements(By.XPATH, selector):
                         if element.is_displayed() and element.text.strip():
                             text = element.text.strip()
                             # Check if it looks like a date
@@ -810,8 +1076,13 @@ class GoogleMapsMaxReviewScraper:
                                     re.search(r'\d+/\d+', text) or  # MM/DD format
                                     re.search(r'\d+-\d+', text)  # MM-DD format
                                 ):
-                                date = text
-                                break
+                                return text
+                    return None
+
+                _, found_date = selector_registry.first_match('date', date_selectors, find_date,
+                                                              catch_all=date_selectors[-1:])
+                if found_date:
+                    date = found_date
             except:
                 pass
             
@@ -864,16 +1135,11 @@ class GoogleMapsMaxReviewScraper:
                 'reviewer_name': reviewer_name,
                 'rating': rating_value,
                 'date': date,
-                'review_text': review_text or "No review text found",
+                'review_text': review_text,
                 'has_photos': has_photos
             }
-            
-            # Skip reviews without meaningful content
-            if review_data['review_text'] == "No review text found" and review_data['rating'] == 0.0:
-                print("Skipping review with no meaningful content")
-                return None
-                
-            return review_data
+
+            return self._finalize_review_data(review_data)
             
         except Exception as e:
             print(f"Error extracting review data: {str(e)}")
@@ -921,8 +1187,8 @@ class GoogleMapsMaxReviewScraper:
             print(f"Text: {review['review_text'][:100]}..." if len(review['review_text']) > 100 else f"Text: {review['review_text']}")
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
+        """Close the browser unless it belongs to a pool"""
+        if self.driver and self.owns_driver:
             self.driver.quit()
             print("Browser closed")
 
@@ -1084,24 +1350,135 @@ def scrape_gmaps_reviews(
     max_attempts: int = 30,
     headless: bool = True,
     chrome_binary_path: str = None,
-    output_file: str = DATA_DIR
+    output_file: str = DATA_DIR,
+    extraction_mode: str = "page",
+    browser_pool=None,
+    delta: bool = False,
+    stop_event=None,
+    scrape_info=None
+):
+    """
+    Scrape reviews for one place, optionally with a browser leased from `browser_pool`.
+
+    With delta=True the reviews are sorted newest first, scrolling stops at the first
+    review seen in a previous run, and only the new reviews are returned and saved.
+
+    Raises RuntimeError if no reviews were collected, unless a delta run found that
+    there is nothing new. Setting `stop_event` ends the scrape before its next scroll
+    pass without writing anything. If `scrape_info` is a dict, the session's resource
+    usage report is stored in it under 'resource_report'.
+    """
+    return list(iter_gmaps_reviews(
+        place_url,
+        num_reviews=num_reviews,
+        max_wait=max_wait,
+        max_attempts=max_attempts,
+        headless=headless,
+        chrome_binary_path=chrome_binary_path,
+        output_file=output_file,
+        extraction_mode=extraction_mode,
+        browser_pool=browser_pool,
+        delta=delta,
+        stop_event=stop_event,
+        scrape_info=scrape_info
+    ))
+
+def iter_gmaps_reviews(
+    place_url: str,
+    num_reviews: int = 10,
+    max_wait: float = 5,
+    max_attempts: int = 30,
+    headless: bool = True,
+    chrome_binary_path: str = None,
+    output_file: str = DATA_DIR,
+    extraction_mode: str = "page",
+    browser_pool=None,
+    delta: bool = False,
+    deferred_writes=None,
+    stop_event=None,
+    scrape_info=None
 ):
+    """
+    Streaming version of scrape_gmaps_reviews that yields each review as it is extracted.
+
+    The output file and delta record are written once the generator is exhausted. If
+    `deferred_writes` is a list, they are instead appended to it as a callable, for
+    the caller to run once it has stored whatever it made of the reviews; a failure
+    in between then leaves the delta record untouched. `scrape_info` is filled as in
+    scrape_gmaps_reviews once the generator is exhausted.
+    """
+    known_reviews = SeenReviewStore(place_url) if delta else None
+
+    if browser_pool is not None:
+        with browser_pool.lease(timeout=BROWSER_POOL_LEASE_TIMEOUT) as driver:
+            scraper = GoogleMapsMaxReviewScraper(driver=driver)
+            yield from _iter_scrape(scraper, place_url, num_reviews, max_wait, max_attempts,
+                                    output_file, extraction_mode, known_reviews, deferred_writes, stop_event,
+                                    scrape_info)
+        return
+
     scraper = GoogleMapsMaxReviewScraper(
         headless=headless,
-        chrome_binary_path=chrome_binary_path
+        chrome_binary_path=chrome_binary_path,
+        capture_network=extraction_mode == "network"
     )
     try:
-        reviews = scraper.scrape_reviews(
-            place_url=place_url,
-            target_reviews=num_reviews,
-            max_wait_time=max_wait,
-            max_scroll_attempts=max_attempts
-        )
-        if output_file:
-            scraper.save_reviews_to_files(reviews, output_file)
-        return reviews
+        yield from _iter_scrape(scraper, place_url, num_reviews, max_wait, max_attempts,
+                                output_file, extraction_mode, known_reviews, deferred_writes, stop_event,
+                                scrape_info)
     finally:
         scraper.close()
 
+def _iter_scrape(scraper, place_url, num_reviews, max_wait, max_attempts, output_file, extraction_mode,
+                 known_reviews=None, deferred_writes=None, stop_event=None, scrape_info=None):
+    reviews = []
+    for review in scraper.iter_reviews(
+        place_url=place_url,
+        target_reviews=num_reviews,
+        max_wait_time=max_wait,
+        max_scroll_attempts=max_attempts,
+        extraction_mode=extraction_mode,
+        newest_first=known_reviews is not None,
+        known_reviews=known_reviews,
+        stop_event=stop_event
+    ):
+        # Keep a copy: consumers may add to the yielded dict (e.g. its sentiment) before
+        # deferred writes save the raw reviews
+        reviews.append(dict(review))
+        yield review
+
+    if scrape_info is not None:
+        scrape_info['resource_report'] = scraper.last_resource_report
+
+    if stop_event is not None and stop_event.is_set():
+        # A cancelled scrape is incomplete; leave the delta record and output file alone
+        return
+
+    if not reviews and not scraper.last_reached_known:
+        # Navigation or the reviews panel failed; only a delta run that reached the old
+        # reviews may legitimately come back empty
+        raise RuntimeError(f"No reviews could be collected from {place_url}")
+
+    # Only record a delta run if it reached the old data (or is the first one); otherwise
+    # reviews between these and the previous scrape were never collected, and the next
+    # run would stop before them
+    record_delta = known_reviews is not None and (scraper.last_reached_known or len(known_reviews) == 0)
+
+    def write_results():
+        if known_reviews is not None:
+            print(f"Delta scrape found {len(reviews)} new reviews ({len(known_reviews)} already known)")
+            if record_delta:
+                known_reviews.merge(reviews)
+                known_reviews.save()
+            else:
+                print("Delta scrape did not reach previously scraped reviews, keeping the old record")
+        if output_file:
+            scraper.save_reviews_to_files(reviews, output_file)
+
+    if deferred_writes is not None:
+        deferred_writes.append(write_results)
+    else:
+        write_results()
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""Read review data from the Maps RPC responses captured through the DevTools Protocol.
+
+The driver must be launched with performance logging enabled
+(``create_chrome_driver(capture_network=True)``). Parsing is kept separate from
+capture so recorded response bodies can be replayed offline.
+"""
+import json
+
+# RPC endpoint the Maps UI calls to page through reviews. Only this layout is parsed;
+# other review RPCs (e.g. listentitiesreviews) are left to the DOM scraper.
+REVIEW_RPC_MARKERS = ('listugcposts',)
+
+# Positions of the fields inside one review record of a listugcposts payload
+REVIEW_ID_PATH = (0, 0)
+REVIEWER_NAME_PATH = (0, 1, 4, 5, 0)
+RELATIVE_DATE_PATH = (0, 1, 6)
+RATING_PATH = (0, 2, 0, 0)
+PHOTOS_PATH = (0, 2, 2)
+TEXT_PATH = (0, 2, 15, 0, 0)
+TRANSLATED_TEXT_PATH = (0, 2, 15, 1, 0)
+
+
+def _get(data, path):
+    """Follow a path of list indices, returning None as soon as it leads nowhere"""
+    for index in path:
+        if not isinstance(data, list) or index >= len(data):
+            return None
+        data = data[index]
+    return data
+
+
+def _load_payload(body):
+    # Maps prefixes its JSON responses with an anti-XSSI guard line
+    if body.startswith(")]}'"):
+        body = body.split('\n', 1)[1] if '\n' in body else body[4:]
+    return json.loads(body)
+
+
+def _is_review_record(record):
+    """A review record has an id string followed by the reviewer and review blocks"""
+    return (isinstance(_get(record, REVIEW_ID_PATH), str)
+            and isinstance(_get(record, (0, 1)), list)
+            and isinstance(_get(record, (0, 2)), list))
+
+
+def _find_review_list(payload):
+    """Locate the list of review records, which listugcposts returns at payload[2]"""
+    candidate = _get(payload, (2,))
+    if isinstance(candidate, list) and candidate and all(_is_review_record(record) for record in candidate):
+        return candidate
+    return []
+
+
+def parse_review_payload(body):
+    """
+    Parse one captured review RPC response body.
+
+    Returns:
+        List of (review_id, review_data) tuples in the shape the scraper produces
+    """
+    try:
+        payload = _load_payload(body)
+    except (ValueError, IndexError) as e:
+        print(f"Could not parse review payload: {str(e)}")
+        return []
+
+    results = []
+    for record in _find_review_list(payload):
+        review_id = _get(record, REVIEW_ID_PATH)
+
+        # Skip reviews that Google only shows as a translation
+        if _get(record, TRANSLATED_TEXT_PATH) and not _get(record, TEXT_PATH):
+            continue
+
+        rating = _get(record, RATING_PATH)
+        results.append((review_id, {
+            'reviewer_name': _get(record, REVIEWER_NAME_PATH) or "Unknown Reviewer",
+            'rating': float(rating) if isinstance(rating, (int, float)) else 0.0,
+            'date': _get(record, RELATIVE_DATE_PATH) or "Unknown Date",
+            'review_text': _get(record, TEXT_PATH) or "",
+            'has_photos': bool(_get(record, PHOTOS_PATH))
+        }))
+    return results
+
+
+class NetworkReviewCapture:
+    """Collect review RPC responses from a driver's performance log"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = {}
+
+    def is_available(self):
+        try:
+            self.driver.get_log('performance')
+            return True
+        except Exception:
+            return False
+
+    def reset(self):
+        """Drop log entries left over from earlier pages"""
+        self.pending.clear()
+        try:
+            self.driver.get_log('performance')
+        except Exception:
+            pass
+
+    def read_bodies(self):
+        """Return the bodies of review responses that finished loading since the last call"""
+        bodies = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                if any(marker in url for marker in REVIEW_RPC_MARKERS):
+                    self.pending[params['requestId']] = url
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+                request_id = params['requestId']
+                self.pending.pop(request_id)
+                try:
+                    response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                    bodies.append(response.get('body', ''))
+                except Exception as e:
+                    print(f"Could not read review response body: {str(e)}")
+        return bodies
+
+    def read_reviews(self):
+        """Parse every review response captured since the last call"""
+        reviews = []
+        for body in self.read_bodies():
+            reviews.extend(parse_review_payload(body))
+        return reviews
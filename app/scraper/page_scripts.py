@@ -0,0 +1,258 @@
+"""JavaScript snippets executed inside the Google Maps page by the scraper.
+
+Each snippet is meant to be passed to ``driver.execute_script`` so that the
+work happens in the browser in a single WebDriver round-trip.
+"""
+
+# Page-side cursor shared by the extraction scripts. Processed review nodes are
+# tagged with data-scraped and their ids kept in window.__scrapedReviewIds, so each
+# pass only touches the nodes appended since the previous one.
+REVIEW_CURSOR_JS = r"""
+window.__scrapedReviewIds = window.__scrapedReviewIds || new Set();
+
+function pendingReviewNodes(root) {
+    const pending = [];
+    const ids = new Set();
+    for (const node of root.querySelectorAll('div[data-review-id]:not([data-scraped])')) {
+        const reviewId = node.getAttribute('data-review-id');
+        // Google nests several elements with the same id; the outermost one comes first
+        if (!reviewId || ids.has(reviewId)) {
+            continue;
+        }
+        if (window.__scrapedReviewIds.has(reviewId)) {
+            node.setAttribute('data-scraped', '1');
+            continue;
+        }
+        ids.add(reviewId);
+        pending.push([node, reviewId]);
+    }
+    return pending;
+}
+
+function markReviewDone(node, reviewId) {
+    window.__scrapedReviewIds.add(reviewId);
+    node.setAttribute('data-scraped', '1');
+    for (const inner of node.querySelectorAll('[data-review-id]')) {
+        inner.setAttribute('data-scraped', '1');
+    }
+}
+"""
+
+# Return the review elements not extracted yet with their ids. They are not marked;
+# the element path calls MARK_REVIEW_DONE_JS once a review was extracted, so one that
+# failed (e.g. not rendered yet) is offered again on the next pass.
+PENDING_REVIEWS_JS = REVIEW_CURSOR_JS + r"""
+return {pending: pendingReviewNodes(document), done: window.__scrapedReviewIds.size};
+"""
+
+# Mark arguments[0] (a review element with id arguments[1]) as extracted
+MARK_REVIEW_DONE_JS = REVIEW_CURSOR_JS + r"""
+markReviewDone(arguments[0], arguments[1]);
+"""
+
+# Default CSS selectors per field for the in-page extraction, precise first; the scraper
+# passes them reordered by their learned hit rate
+PAGE_SELECTORS = {
+    'page_name': ['.d4r55', '.fontHeadlineSmall', '.fontTitleLarge'],
+    'page_text': ['span.wiI7pd', '.review-full-text', '.MyEned', '.fontBodyMedium'],
+    'page_date': ['.rsqaWe', '.DU9Pgb', '.fontBodySmall'],
+}
+
+# Generic typography classes that match some element in almost every review; they are
+# always tried last
+PAGE_CATCH_ALL_SELECTORS = {
+    'page_name': ['.fontHeadlineSmall', '.fontTitleLarge'],
+    'page_text': ['.fontBodyMedium'],
+    'page_date': ['.fontBodySmall'],
+}
+
+# Expand the "More" buttons of new reviews, then read every visible review appended
+# since the last call. arguments[0] is an optional root element, arguments[1] the
+# selector lists keyed like PAGE_SELECTORS. Returns a JSON string with the reviews
+# and per-selector hit/try counts. Built for one execute_script call per scroll iteration.
+EXTRACT_REVIEWS_JS = REVIEW_CURSOR_JS + r"""
+const MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec',
+                'mei', 'agu', 'okt', 'des'];
+const SELECTORS = arguments[1];
+const selectorStats = {};
+
+function tally(group, selector, hit) {
+    selectorStats[group] = selectorStats[group] || {};
+    const entry = selectorStats[group][selector] = selectorStats[group][selector] || {hits: 0, tries: 0};
+    entry.tries += 1;
+    if (hit) {
+        entry.hits += 1;
+    }
+}
+
+function isVisible(el) {
+    return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length));
+}
+
+function cleanText(el) {
+    return ((el && (el.innerText || el.textContent)) || '').trim();
+}
+
+function looksLikeDate(text) {
+    const lower = text.toLowerCase();
+    return text.length < 30 && (
+        lower.includes('ago') || lower.includes('lalu') ||
+        MONTHS.some(m => lower.includes(m)) ||
+        /\d+\/\d+/.test(text) || /\d+-\d+/.test(text)
+    );
+}
+
+function firstText(root, group, accept) {
+    for (const selector of SELECTORS[group]) {
+        for (const el of root.querySelectorAll(selector)) {
+            const text = cleanText(el);
+            if (text && isVisible(el) && (!accept || accept(text))) {
+                tally(group, selector, true);
+                return text;
+            }
+        }
+        tally(group, selector, false);
+    }
+    return '';
+}
+
+function parseRating(label) {
+    const match = (label || '').replace(',', '.').match(/\d+(\.\d+)?/);
+    const rating = match ? parseFloat(match[0]) : 0.0;
+    return rating >= 1 && rating <= 5 ? rating : 0.0;
+}
+
+function extractRating(root) {
+    // Indonesian pages label the stars "5 bintang"; other layouts show "4/5" as text
+    const stars = root.querySelectorAll(
+        'span[role="img"][aria-label*="star"], span[role="img"][aria-label*="bintang"], span.kvMYJc[aria-label]');
+    for (const star of stars) {
+        const rating = parseRating(star.getAttribute('aria-label'));
+        if (rating) {
+            return rating;
+        }
+    }
+    for (const el of root.querySelectorAll('.fzvQIb')) {
+        const rating = parseRating(cleanText(el));
+        if (rating) {
+            return rating;
+        }
+    }
+    return 0.0;
+}
+
+const root = arguments[0] || document;
+const pending = pendingReviewNodes(root).filter(([node]) => isVisible(node));
+
+// Expand truncated reviews first so the text we read below is complete
+for (const [node] of pending) {
+    for (const button of node.querySelectorAll('button')) {
+        const label = cleanText(button);
+        if ((label === 'More' || label === 'more' || label === 'Lainnya') && isVisible(button)) {
+            try { button.click(); } catch (e) {}
+        }
+    }
+}
+
+const reviews = [];
+for (const [node, reviewId] of pending) {
+    const fullText = cleanText(node);
+    if (fullText.includes('Translated by Google') || fullText.includes('Terjemahan oleh Google')) {
+        markReviewDone(node, reviewId);
+        continue;
+    }
+
+    let reviewText = '';
+    const textTries = [];
+    for (const selector of SELECTORS.page_text) {
+        for (const el of node.querySelectorAll(selector)) {
+            const text = cleanText(el);
+            if (isVisible(el) && text.length > 5 && !looksLikeDate(text) && text.length > reviewText.length) {
+                reviewText = text;
+            }
+        }
+        textTries.push([selector, !!reviewText]);
+        if (reviewText) {
+            break;
+        }
+    }
+    // Rating-only reviews have no text to find, so they say nothing about the selectors
+    if (reviewText) {
+        for (const [selector, hit] of textTries) {
+            tally('page_text', selector, hit);
+        }
+    }
+
+    const rating = extractRating(node);
+    // Leave reviews that have not rendered yet for the next pass
+    if (!reviewText && rating === 0.0) {
+        continue;
+    }
+    markReviewDone(node, reviewId);
+
+    const photos = node.querySelectorAll(
+        'button[jsaction*="reviewPhoto"], button[aria-label*="Photo"], button[aria-label*="Foto"]');
+
+    reviews.push({
+        review_id: reviewId,
+        reviewer_name: firstText(node, 'page_name') || 'Unknown Reviewer',
+        rating: rating,
+        date: firstText(node, 'page_date', looksLikeDate) || 'Unknown Date',
+        review_text: reviewText,
+        has_photos: photos.length > 0
+    });
+}
+return JSON.stringify({reviews: reviews, selectorStats: selectorStats});
+"""
+
+# Install (once per document) a MutationObserver that counts appended review nodes
+# and remembers when the DOM last changed. Returns the current counter state.
+REVIEW_OBSERVER_JS = r"""
+if (!window.__reviewObserver) {
+    const state = {added: 0, lastMutation: Date.now()};
+    const observer = new MutationObserver(mutations => {
+        for (const mutation of mutations) {
+            for (const node of mutation.addedNodes) {
+                if (node.nodeType !== 1) {
+                    continue;
+                }
+                if (node.matches('div[data-review-id]')) {
+                    state.added += 1;
+                } else {
+                    state.added += node.querySelectorAll('div[data-review-id]').length;
+                }
+            }
+        }
+        state.lastMutation = Date.now();
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+    window.__reviewObserver = state;
+}
+return {added: window.__reviewObserver.added,
+        quietMs: Date.now() - window.__reviewObserver.lastMutation};
+"""
+
+# Summarize what the current page downloaded and how many of its images were blocked.
+# arguments[0] is the list of blocked URL substrings of the active profile.
+RESOURCE_USAGE_JS = r"""
+const blockedMarkers = arguments[0] || [];
+const isBlocked = url => blockedMarkers.some(marker => url.includes(marker));
+
+let loadedBytes = 0;
+let loadedRequests = 0;
+for (const entry of performance.getEntriesByType('resource')) {
+    loadedBytes += entry.transferSize || 0;
+    loadedRequests += 1;
+}
+
+let blockedImages = 0;
+for (const img of document.images) {
+    if (img.complete && img.naturalWidth === 0 && isBlocked(img.currentSrc || img.src || '')) {
+        blockedImages += 1;
+    }
+}
+let blockedFonts = 0;
+document.fonts.forEach(font => { if (font.status === 'error') { blockedFonts += 1; } });
+
+return {loadedBytes, loadedRequests, blockedImages, blockedFonts};
+"""
@@ -0,0 +1,122 @@
+import threading
+from app.scraper.page_scripts import RESOURCE_USAGE_JS
+
+# URL patterns passed to the DevTools Network.setBlockedURLs command, per profile
+BLOCK_PROFILES = {
+    "none": [],
+    # Everything a review scrape does not need: map tiles, photos, fonts and video
+    "review_text": [
+        "*/maps/vt*",
+        "*/kh/vt*",
+        "*streetviewpixels*",
+        "*.googleusercontent.com/*",
+        "*.ggpht.com/*",
+        "*fonts.gstatic.com/*",
+        "*.woff2*",
+        "*.woff*",
+        "*.ttf*",
+        "*.png*",
+        "*.jpg*",
+        "*.jpeg*",
+        "*.gif*",
+        "*.webp*",
+        "*.mp4*",
+        "*.webm*",
+    ],
+    # Only map tiles and video, for when photos are needed
+    "tiles": [
+        "*/maps/vt*",
+        "*/kh/vt*",
+        "*streetviewpixels*",
+        "*.mp4*",
+        "*.webm*",
+    ],
+}
+
+# Typical transfer size of one blocked resource, used to estimate the bytes saved
+AVERAGE_IMAGE_BYTES = 35_000
+AVERAGE_FONT_BYTES = 20_000
+ESTIMATE_BASIS = (f"blocked request counts times fixed sizes of {AVERAGE_IMAGE_BYTES} bytes per image "
+                  f"and {AVERAGE_FONT_BYTES} bytes per font, not measured transfers")
+
+
+class ResourceBlocker:
+    """Block heavy resource types for a driver session and report the savings"""
+
+    def __init__(self, profile="review_text"):
+        if profile not in BLOCK_PROFILES:
+            raise ValueError(f"Unknown resource blocking profile '{profile}', expected one of {list(BLOCK_PROFILES)}")
+        self.profile = profile
+        self.patterns = BLOCK_PROFILES[profile]
+
+    def apply(self, driver):
+        """Install the profile's URL patterns; returns False if CDP is not available"""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+            if self.patterns:
+                print(f"Blocking {len(self.patterns)} resource patterns (profile '{self.profile}')")
+            return True
+        except Exception as e:
+            print(f"Could not enable resource blocking: {str(e)}")
+            return False
+
+    def report(self, driver):
+        """
+        Bytes the current page loaded plus an estimate of what blocking saved.
+
+        Blocked requests never transfer, so `estimated_bytes_saved` is not measured: it
+        multiplies the blocked image and font counts by fixed per-resource sizes, as
+        described by `estimate_basis`.
+        """
+        markers = [pattern.strip('*') for pattern in self.patterns]
+        try:
+            usage = driver.execute_script(RESOURCE_USAGE_JS, markers)
+        except Exception as e:
+            print(f"Could not read resource usage: {str(e)}")
+            return None
+
+        report = {
+            'profile': self.profile,
+            'loaded_requests': usage['loadedRequests'],
+            'loaded_bytes': usage['loadedBytes'],
+            'blocked_images': usage['blockedImages'],
+            'blocked_fonts': usage['blockedFonts'],
+            'estimated_bytes_saved': (usage['blockedImages'] * AVERAGE_IMAGE_BYTES +
+                                      usage['blockedFonts'] * AVERAGE_FONT_BYTES),
+            'estimate_basis': ESTIMATE_BASIS
+        }
+        print(f"Resource usage: {report['loaded_bytes'] / 1e6:.1f} MB loaded in {report['loaded_requests']} requests, "
+              f"~{report['estimated_bytes_saved'] / 1e6:.1f} MB estimated saved by blocking")
+        resource_usage_stats.record(report)
+        return report
+
+
+class ResourceUsageStats:
+    """Totals of the per-session resource reports, plus the most recent one"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.loaded_bytes = 0
+        self.estimated_bytes_saved = 0
+        self.last_report = None
+
+    def record(self, report):
+        with self._lock:
+            self.sessions += 1
+            self.loaded_bytes += report['loaded_bytes']
+            self.estimated_bytes_saved += report['estimated_bytes_saved']
+            self.last_report = report
+
+    def stats(self):
+        return {
+            "sessions": self.sessions,
+            "loaded_bytes": self.loaded_bytes,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "estimate_basis": ESTIMATE_BASIS,
+            "last_report": self.last_report
+        }
+
+
+resource_usage_stats = ResourceUsageStats()
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import re
+import time
+from app.core.config import SEEN_REVIEWS_DIR
+from app.core.storage import save_json_atomic
+
+
+def review_signature(review_data):
+    """Content signature used to spot the same review under a different id"""
+    review_text = (review_data.get('review_text') or '').strip()
+    return f"{review_data.get('reviewer_name')}:{review_text[:50]}"
+
+
+def place_key(place_url):
+    """Stable file name for a place, preferring the Maps place id when the URL has one"""
+    match = re.search(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", place_url)
+    if match:
+        return match.group(1).replace(':', '_')
+    return hashlib.sha1(place_url.split('?')[0].encode('utf-8')).hexdigest()
+
+
+class SeenReviewStore:
+    """On-disk record of the review ids and signatures already scraped for one place"""
+
+    def __init__(self, place_url, store_dir=SEEN_REVIEWS_DIR):
+        self.place_url = place_url
+        self.path = os.path.join(store_dir, f"{place_key(place_url)}.json")
+        self.review_ids = set()
+        self.signatures = set()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.review_ids = set(data.get('review_ids', []))
+            self.signatures = set(data.get('signatures', []))
+            print(f"Loaded {len(self.review_ids)} known reviews from {self.path}")
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not read seen reviews from {self.path}: {str(e)}")
+
+    def __len__(self):
+        return len(self.review_ids)
+
+    def is_known(self, review_id, review_data=None):
+        """True if the review was collected by a previous scrape"""
+        if review_id in self.review_ids:
+            return True
+        return review_data is not None and review_signature(review_data) in self.signatures
+
+    def merge(self, reviews):
+        """Add freshly scraped reviews to the record"""
+        for review in reviews:
+            if review.get('review_id'):
+                self.review_ids.add(review['review_id'])
+            self.signatures.add(review_signature(review))
+
+    def save(self):
+        data = {
+            'place_url': self.place_url,
+            'updated_at': time.time(),
+            'review_ids': sorted(self.review_ids),
+            'signatures': sorted(self.signatures)
+        }
+        save_json_atomic(self.path, data, ensure_ascii=False)
+        print(f"Saved {len(self.review_ids)} known reviews to {self.path}")
@@ -0,0 +1,97 @@
+import json
+import os
+import random
+import threading
+from app.core.config import SELECTOR_STATS_FILE, SELECTOR_STATS_DECAY, SELECTOR_EXPLORE_RATE
+from app.core.storage import save_json_atomic
+
+
+class SelectorRegistry:
+    """
+    Hit-rate statistics per locator, persisted across runs.
+
+    Locators of a group are tried in order of their historical hit rate, so the
+    selector that matches the current Maps layout is tried first and the others
+    are only paid for on a miss. Catch-all locators, which match almost anything,
+    are kept last in their given order: their high hit rate says nothing about
+    whether they found the right element.
+
+    Older outcomes fade by `decay` with every new one, and an `explore_rate` share of
+    lookups keeps the given order, so a locator demoted by a few misses is still
+    tried now and then and can win its place back.
+    """
+
+    def __init__(self, path=SELECTOR_STATS_FILE, decay=SELECTOR_STATS_DECAY, explore_rate=SELECTOR_EXPLORE_RATE):
+        self.path = path
+        self.decay = decay
+        self.explore_rate = explore_rate
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.stats = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not read selector stats from {self.path}: {str(e)}")
+
+    @staticmethod
+    def _key(locator):
+        # Locators are either plain CSS strings or (By, value) tuples
+        return locator if isinstance(locator, str) else f"{locator[0]}:{locator[1]}"
+
+    def _score(self, group, locator):
+        entry = self.stats.get(group, {}).get(self._key(locator))
+        if not entry:
+            return 0.5
+        # Laplace-smoothed hit rate so a single lucky hit does not dominate
+        return (entry['hits'] + 1) / (entry['tries'] + 2)
+
+    def ordered(self, group, locators, catch_all=()):
+        """Locators sorted by hit rate, then the catch_all ones; ties keep their original order"""
+        specific = [locator for locator in locators if locator not in catch_all]
+        if random.random() >= self.explore_rate:
+            with self._lock:
+                specific.sort(key=lambda locator: -self._score(group, locator))
+        return specific + [locator for locator in locators if locator in catch_all]
+
+    def record(self, group, locator, hit, tries=1, hits=None):
+        """Record `tries` attempts of a locator, `hits` of which matched (all or none by default)"""
+        if hits is None:
+            hits = tries if hit else 0
+        with self._lock:
+            entry = self.stats.setdefault(group, {}).setdefault(self._key(locator), {'hits': 0, 'tries': 0})
+            entry['hits'] = entry['hits'] * self.decay + hits
+            entry['tries'] = entry['tries'] * self.decay + tries
+            self._dirty = True
+
+    def first_match(self, group, locators, find, catch_all=()):
+        """
+        Try locators in learned order and return the first non-empty `find(locator)` result.
+
+        Returns:
+            (locator, result) or (None, None) when every locator missed
+        """
+        for locator in self.ordered(group, locators, catch_all):
+            try:
+                result = find(locator)
+            except Exception:
+                result = None
+            self.record(group, locator, bool(result))
+            if result:
+                return locator, result
+        return None, None
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            save_json_atomic(self.path, self.stats, indent=2)
+            self._dirty = False
+
+
+selector_registry = SelectorRegistry()
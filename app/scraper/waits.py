@@ -0,0 +1,72 @@
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from app.scraper.page_scripts import REVIEW_OBSERVER_JS
+
+POLL_INTERVAL = 0.1
+
+
+def wait_until(driver, condition, timeout, poll_interval=POLL_INTERVAL):
+    """
+    Poll `condition(driver)` until it is truthy or `timeout` seconds pass.
+
+    Returns the condition's value, or False when the deadline is reached.
+    """
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_interval).until(condition)
+    except TimeoutException:
+        return False
+
+
+def wait_for_document_ready(driver, timeout=10):
+    """Wait until the browser reports the document as fully loaded"""
+    return wait_until(driver, lambda d: d.execute_script("return document.readyState") == "complete", timeout)
+
+
+def wait_for_any(driver, css_selectors, timeout=10):
+    """Wait until any element matching one of `css_selectors` exists"""
+    selector = ", ".join(css_selectors)
+    return wait_until(
+        driver,
+        lambda d: d.execute_script("return document.querySelector(arguments[0]) !== null;", selector),
+        timeout
+    )
+
+
+def review_observer_state(driver):
+    """Install the review MutationObserver if needed and return {added, quietMs}"""
+    return driver.execute_script(REVIEW_OBSERVER_JS)
+
+
+def wait_for_new_reviews(driver, baseline, timeout, settle_ms=300):
+    """
+    Wait until review nodes beyond `baseline` have been appended and the DOM has
+    been quiet for `settle_ms`. `timeout` is an upper bound, not a fixed cost.
+
+    Args:
+        driver: Selenium driver
+        baseline: Observer count from before the scroll (see review_observer_state)
+        timeout: Maximum seconds to wait
+        settle_ms: How long the DOM must stay unchanged after new reviews arrive
+
+    Returns:
+        The new observer count, or None when the deadline passed without new reviews
+    """
+    def new_reviews_settled(d):
+        state = d.execute_script(REVIEW_OBSERVER_JS)
+        if state["added"] > baseline and state["quietMs"] >= settle_ms:
+            return state["added"]
+        return False
+
+    start = time.monotonic()
+    try:
+        result = wait_until(driver, new_reviews_settled, timeout)
+    except WebDriverException as e:
+        # Fall back to the deadline if the observer cannot run on this page
+        print(f"Review observer unavailable: {str(e)}")
+        time.sleep(max(0, timeout - (time.monotonic() - start)))
+        return None
+    if result is False:
+        return None
+    print(f"New reviews loaded after {time.monotonic() - start:.2f}s")
+    return result
@@ -0,0 +1,78 @@
+"""
+Measure API start-up time as time-to-first-request.
+
+Usage:
+    python -m app.startup_benchmark
+    python -m app.startup_benchmark --repeats 5 --path /api/models/status
+
+Each run starts a fresh uvicorn process and polls `--path` until it answers with
+HTTP 200; the elapsed time from process launch is reported per run.
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(path, timeout):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode} before answering")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(0.05)
+        raise TimeoutError(f"No response from {url} within {timeout}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API time-to-first-request")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--path", default="/api/models/resources", help="Endpoint polled until it answers")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait per run")
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.repeats):
+        seconds = time_to_first_request(args.path, args.timeout)
+        print(f"Run {i + 1}: first response after {seconds:.2f}s")
+        runs.append(seconds)
+
+    print(json.dumps({
+        "path": args.path,
+        "runs": [round(seconds, 3) for seconds in runs],
+        "median_seconds": round(statistics.median(runs), 3),
+        "min_seconds": round(min(runs), 3)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
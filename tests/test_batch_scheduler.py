@@ -0,0 +1,65 @@
+"""Retries and cancellation of the batch scrape scheduler."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("undetected_chromedriver")
+
+from app.scraper import batch_scheduler
+from app.scraper.batch_scheduler import BatchScrapeScheduler
+
+URL = "https://www.google.com/maps/place/Warung+Bakso"
+
+
+def test_closing_the_stream_stops_running_scrapes(monkeypatch):
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def scrape(url, stop_event=None, **kwargs):
+        started.set()
+        # Stand-in for the scroll loop, which checks the event once per pass
+        while not stop_event.wait(0.05):
+            pass
+        stopped.set()
+        return []
+
+    monkeypatch.setattr(batch_scheduler, "scrape_gmaps_reviews", scrape)
+
+    async def scenario():
+        results = BatchScrapeScheduler(browser_pool=None, host_min_interval=0).run([URL])
+        consumer = asyncio.ensure_future(results.__anext__())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        # A client disconnect cancels the response stream
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        await results.aclose()
+
+    asyncio.run(scenario())
+    assert stopped.wait(2)
+
+
+def test_failed_attempts_are_retried(monkeypatch):
+    attempts = []
+
+    def scrape(url, scrape_info=None, **kwargs):
+        attempts.append(time.monotonic())
+        if len(attempts) < 2:
+            raise RuntimeError(f"No reviews could be collected from {url}")
+        scrape_info["resource_report"] = {"loaded_bytes": 1_500_000, "estimated_bytes_saved": 410_000}
+        return [{"review_id": "r1", "review_text": "Enak"}]
+
+    monkeypatch.setattr(batch_scheduler, "scrape_gmaps_reviews", scrape)
+
+    async def scenario():
+        scheduler = BatchScrapeScheduler(browser_pool=None, host_min_interval=0, max_retries=2, retry_backoff=0.01)
+        return [result async for result in scheduler.run([URL])]
+
+    [result] = asyncio.run(scenario())
+    assert result["status"] == "success"
+    assert result["attempts"] == 2 and result["review_count"] == 1
+    assert result["resource_report"]["estimated_bytes_saved"] == 410_000
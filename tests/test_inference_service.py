@@ -0,0 +1,66 @@
+"""Shutdown and timeout behaviour of the sentiment micro-batching service."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.ml.inference_service import SentimentInferenceService
+
+
+def _slow_predict(seconds):
+    def predict(review_texts):
+        time.sleep(seconds)
+        return ["positive"] * len(review_texts)
+    return predict
+
+
+async def _wait_for(threads):
+    # Keep the event loop running while the callers wait for it
+    while any(thread.is_alive() for thread in threads):
+        await asyncio.sleep(0.05)
+
+
+def _call(service, results, key, **kwargs):
+    try:
+        results[key] = service.classify_threadsafe(["enak", "mahal"], **kwargs)
+    except Exception as e:
+        results[key] = e
+
+
+def test_close_fails_the_batch_in_flight():
+    async def scenario():
+        service = SentimentInferenceService(max_batch=4, max_wait_ms=20)
+        service._predict = _slow_predict(1.0)
+        service.start()
+        results = {}
+        callers = [threading.Thread(target=_call, args=(service, results, i), kwargs={"timeout": 30})
+                   for i in range(3)]
+        for caller in callers:
+            caller.start()
+        await asyncio.sleep(0.3)
+        await service.close()
+        await asyncio.wait_for(_wait_for(callers), 10)
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(results) == 3
+    assert all(isinstance(result, RuntimeError) for result in results.values())
+
+
+def test_classify_threadsafe_times_out():
+    async def scenario():
+        service = SentimentInferenceService()
+        service._predict = _slow_predict(2.0)
+        service.start()
+        results = {}
+        caller = threading.Thread(target=_call, args=(service, results, "labels"), kwargs={"timeout": 0.2})
+        caller.start()
+        await _wait_for([caller])
+        await service.close()
+        return results
+
+    assert isinstance(asyncio.run(scenario())["labels"], TimeoutError)
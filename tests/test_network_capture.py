@@ -0,0 +1,109 @@
+"""Replay a recorded listugcposts response through a local stand-in server."""
+import http.server
+import json
+import threading
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from app.scraper.network_capture import NetworkReviewCapture, parse_review_payload
+
+FIXTURES = Path(__file__).parent / "fixtures"
+RPC_PATH = "/maps/rpc/listugcposts?authuser=0&hl=id"
+
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = (FIXTURES / "listugcposts.txt").read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class _ReplayDriver:
+    """Driver stand-in whose performance log reports one review RPC served by the stand-in server"""
+
+    def __init__(self, url):
+        self.url = url
+        self.log = [
+            self._entry('Network.responseReceived', requestId='1', response={'url': url}),
+            self._entry('Network.responseReceived', requestId='2', response={'url': url.replace('listugcposts', 'photos')}),
+            self._entry('Network.loadingFinished', requestId='2'),
+            self._entry('Network.loadingFinished', requestId='1'),
+        ]
+
+    @staticmethod
+    def _entry(method, **params):
+        return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+    def get_log(self, name):
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        assert command == 'Network.getResponseBody' and params == {'requestId': '1'}
+        with urllib.request.urlopen(self.url) as response:
+            return {'body': response.read().decode('utf-8'), 'base64Encoded': False}
+
+
+def test_parse_recorded_listugcposts_body():
+    reviews = parse_review_payload((FIXTURES / "listugcposts.txt").read_text(encoding="utf-8"))
+
+    assert [review_id for review_id, _ in reviews] == [
+        "ChZDSUhNMG9nS0VJQ0FnSURfa3BmUFp3EAE",
+        "ChdDSUhNMG9nS0VJQ0FnSURfcWNqcUx3EAE",
+        "ChdDSUhNMG9nS0VJQ0FnSURfMHRfTmtRRRAB",
+    ]
+    first = reviews[0][1]
+    assert first == {
+        'reviewer_name': "Rina Kartika",
+        'rating': 5.0,
+        'date': "2 minggu lalu",
+        'review_text': "Bakso urat enak, kuahnya gurih dan porsinya besar. Pelayanan cepat.",
+        'has_photos': True
+    }
+    assert reviews[1][1]['rating'] == 3.0 and not reviews[1][1]['has_photos']
+    # Rating-only reviews are kept with empty text
+    assert reviews[2][1]['review_text'] == ""
+
+
+def test_translated_only_reviews_are_skipped():
+    reviews = parse_review_payload((FIXTURES / "listugcposts.txt").read_text(encoding="utf-8"))
+    assert "John Miller" not in [data['reviewer_name'] for _, data in reviews]
+
+
+@pytest.mark.parametrize("body", [
+    ")]}'\n[null,null,[[[\"not-a-review\"]]]]",
+    ")]}'\n[[[\"CAESY0NBRVFD\",[],[]]]]",
+    ")]}'\n[null,null,[]]",
+    "not json",
+])
+def test_other_payloads_yield_nothing(body):
+    assert parse_review_payload(body) == []
+
+
+def test_capture_replays_through_stand_in_server(stand_in_server):
+    capture = NetworkReviewCapture(_ReplayDriver(stand_in_server + RPC_PATH))
+
+    reviews = capture.read_reviews()
+
+    assert len(reviews) == 3
+    assert reviews[0][1]['reviewer_name'] == "Rina Kartika"
+    assert capture.pending == {}
+    assert capture.read_reviews() == []
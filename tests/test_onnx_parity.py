@@ -0,0 +1,31 @@
+"""The ONNX Runtime backend labels reviews exactly like the torch model."""
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from app.core.config import MODEL_PATH
+from app.ml.compare_models import compare
+from app.ml.onnx_export import export_onnx
+
+TEXTS = json.loads((Path(__file__).parent / "fixtures" / "sentiment_texts.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.skipif(not Path(MODEL_PATH).exists(), reason=f"Fine-tuned model not found at {MODEL_PATH}")
+def test_onnx_labels_match_torch(tmp_path):
+    onnx_path = export_onnx(onnx_path=tmp_path / "model.onnx")
+
+    report = compare("onnx", TEXTS, [None] * len(TEXTS), onnx_path=onnx_path)
+
+    assert report["samples"] == len(TEXTS)
+    assert report["disagreements"] == []
+
+
+def test_compare_rejects_an_empty_sample():
+    with pytest.raises(ValueError):
+        compare("onnx", [], [])
@@ -0,0 +1,84 @@
+"""Run the in-page review extraction on a saved review list loaded over file://."""
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("undetected_chromedriver")
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+from app.scraper import gmaps_scraper
+from app.scraper.gmaps_scraper import GoogleMapsMaxReviewScraper
+from app.scraper.selector_registry import SelectorRegistry
+
+FIXTURE_URL = (Path(__file__).parent / "fixtures" / "reviews.html").resolve().as_uri()
+
+
+@pytest.fixture(scope="module")
+def driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome is not available: {e.msg}")
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def scraper(driver, tmp_path, monkeypatch):
+    # Start from default selector order and keep the learned stats out of data/
+    monkeypatch.setattr(gmaps_scraper, "selector_registry", SelectorRegistry(tmp_path / "selector_stats.json"))
+    driver.get(FIXTURE_URL)
+    return GoogleMapsMaxReviewScraper(driver=driver)
+
+
+def test_extracts_visible_reviews(scraper):
+    reviews = dict(scraper.extract_visible_reviews())
+
+    # rev-3 is only a translation and rev-5 is not rendered
+    assert list(reviews) == ["rev-1", "rev-2", "rev-4"]
+    assert reviews["rev-1"] == {
+        'reviewer_name': "Rina Kartika",
+        'rating': 5.0,
+        'date': "2 minggu lalu",
+        'review_text': "Bakso urat enak, kuahnya gurih dan porsinya besar. Pelayanan cepat.",
+        'has_photos': True
+    }
+    assert reviews["rev-2"]['rating'] == 4.0
+    assert reviews["rev-2"]['review_text'] == "No review text found"
+    assert reviews["rev-4"] == {
+        'reviewer_name': "Andi Wijaya",
+        'rating': 4.0,
+        'date': "3 bulan lalu",
+        'review_text': "Tempatnya bersih tapi antrian panjang saat jam makan siang.",
+        'has_photos': False
+    }
+
+
+def test_more_button_is_expanded(scraper):
+    scraper.extract_visible_reviews()
+
+    assert scraper.driver.find_elements(By.CSS_SELECTOR, 'div[data-review-id="rev-1"] button.w8nwRe') == []
+
+
+def test_cursor_only_returns_new_reviews(scraper):
+    scraper.extract_visible_reviews()
+    scraped = scraper.driver.execute_script(
+        "return Array.from(document.querySelectorAll('[data-scraped]'), el => el.getAttribute('data-review-id'));")
+    # The nested element repeating rev-1's id is marked with it; rev-5 is left for later
+    assert scraped == ["rev-1", "rev-1", "rev-2", "rev-3", "rev-4"]
+
+    assert scraper.extract_visible_reviews() == []
+
+    scraper.driver.execute_script("document.querySelector('[data-review-id=\"rev-5\"]').style.display = '';")
+    reviews = scraper.extract_visible_reviews()
+    assert [review_id for review_id, _ in reviews] == ["rev-5"]
+    assert reviews[0][1]['rating'] == 3.0
+    assert reviews[0][1]['review_text'] == "Es teh terlalu manis, baksonya lumayan."
@@ -0,0 +1,31 @@
+"""Resource reports label the bytes saved as an estimate and add up across sessions."""
+from app.scraper.resource_blocking import (AVERAGE_FONT_BYTES, AVERAGE_IMAGE_BYTES, ResourceBlocker,
+                                           ResourceUsageStats)
+from app.scraper import resource_blocking
+
+
+class FakeDriver:
+    def execute_script(self, script, markers):
+        return {"loadedRequests": 40, "loadedBytes": 1_500_000, "blockedImages": 10, "blockedFonts": 3}
+
+
+def test_report_estimates_savings_from_fixed_sizes(monkeypatch):
+    monkeypatch.setattr(resource_blocking, "resource_usage_stats", ResourceUsageStats())
+    report = ResourceBlocker().report(FakeDriver())
+
+    assert report["estimated_bytes_saved"] == 10 * AVERAGE_IMAGE_BYTES + 3 * AVERAGE_FONT_BYTES
+    assert "fixed sizes" in report["estimate_basis"]
+
+    stats = resource_blocking.resource_usage_stats.stats()
+    assert stats["sessions"] == 1 and stats["loaded_bytes"] == 1_500_000
+    assert stats["last_report"] == report
+
+
+def test_unreadable_usage_gives_no_report(monkeypatch):
+    class BrokenDriver:
+        def execute_script(self, script, markers):
+            raise RuntimeError("no such window")
+
+    monkeypatch.setattr(resource_blocking, "resource_usage_stats", ResourceUsageStats())
+    assert ResourceBlocker().report(BrokenDriver()) is None
+    assert resource_blocking.resource_usage_stats.stats()["sessions"] == 0
@@ -0,0 +1,105 @@
+"""The streaming and in-memory review readers agree, and written arrays parse back."""
+import json
+import threading
+
+import pytest
+
+from app.ml import review_io
+from app.ml.review_io import JsonArrayWriter, iter_review_records
+
+RECORDS = [
+    {"review_text": "Bakso enak, kuah gurih", "rating": 5, "date": "2 minggu lalu"},
+    {"review": "Harga agak mahal", "rating": 3.5},
+    "Pelayanan cepat",
+    {"rating": 4},
+]
+
+DOCUMENTS = {
+    "list": RECORDS,
+    "reviews": {"reviews": RECORDS, "place_url": "https://www.google.com/maps/place/x"},
+    "mapping": {"r1": "Enak sekali", "r2": 4.5, "r3": None},
+    "reviews_not_a_list": {"reviews": {"r1": "Enak"}, "r2": "Mahal"},
+    "reviews_scalar": {"reviews": "Enak sekali"},
+    "reviews_not_first": {"place_url": "https://www.google.com/maps/place/x", "reviews": RECORDS},
+    "empty_list": [],
+    "empty_mapping": {},
+}
+
+
+def _write(tmp_path, document):
+    path = tmp_path / "reviews.json"
+    path.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("name", DOCUMENTS)
+def test_streaming_matches_loaded(tmp_path, name):
+    pytest.importorskip("ijson")
+    path = _write(tmp_path, DOCUMENTS[name])
+
+    assert list(review_io._iter_streaming(path)) == list(review_io._iter_loaded(path))
+
+
+def test_list_shapes_yield_index_text_and_record(tmp_path):
+    path = _write(tmp_path, DOCUMENTS["reviews"])
+
+    assert list(review_io._iter_loaded(path)) == [
+        (0, "Bakso enak, kuah gurih", RECORDS[0]),
+        (1, "Harga agak mahal", RECORDS[1]),
+        (2, "Pelayanan cepat", RECORDS[2]),
+        (3, None, RECORDS[3]),
+    ]
+
+
+def test_mapping_yields_key_and_text(tmp_path):
+    path = _write(tmp_path, DOCUMENTS["mapping"])
+
+    assert list(review_io._iter_loaded(path)) == [("r1", "Enak sekali", None), ("r2", "4.5", None), ("r3", None, None)]
+
+
+@pytest.mark.parametrize("indent", [4, None])
+def test_writer_output_parses_back(tmp_path, indent):
+    path = tmp_path / "out.json"
+    with JsonArrayWriter(path, indent=indent) as writer:
+        for record in RECORDS:
+            writer.write(record)
+
+    assert json.loads(path.read_text(encoding="utf-8")) == RECORDS
+    assert [record for _, _, record in iter_review_records(path)] == RECORDS
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_writer_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text("[]", encoding="utf-8")
+    with pytest.raises(ValueError):
+        with JsonArrayWriter(path) as writer:
+            writer.write(RECORDS[0])
+            raise ValueError("classification failed")
+
+    assert path.read_text(encoding="utf-8") == "[]"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_concurrent_writers_of_one_path(tmp_path):
+    path = tmp_path / "out.json"
+    errors = []
+
+    def write(label):
+        try:
+            for _ in range(20):
+                with JsonArrayWriter(path) as writer:
+                    for i in range(200):
+                        writer.write({"review_text": f"{label} {i}", "sentiment": label})
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=write, args=(label,)) for label in ("positive", "negative")]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+
+    assert errors == []
+    records = json.loads(path.read_text(encoding="utf-8"))
+    assert len(records) == 200 and len({record["sentiment"] for record in records}) == 1
@@ -0,0 +1,65 @@
+"""Learned selector order: catch-alls stay last and demoted selectors can recover."""
+import json
+
+from app.scraper.selector_registry import SelectorRegistry
+
+FEED = ('css selector', 'div[role="feed"]')
+ANCESTOR = ('xpath', '//div[.//div[@data-review-id]]')
+M6QERB = ('css selector', 'div.m6QErb')
+MAIN = ('css selector', 'div[role="main"]')
+CONTAINERS = [FEED, ANCESTOR, M6QERB, MAIN]
+
+
+def _registry(tmp_path, **kwargs):
+    kwargs.setdefault('explore_rate', 0.0)
+    return SelectorRegistry(tmp_path / "selector_stats.json", **kwargs)
+
+
+def test_specific_locators_sorted_by_hit_rate(tmp_path):
+    registry = _registry(tmp_path)
+    registry.record('review_container', FEED, False)
+    registry.record('review_container', M6QERB, True)
+
+    assert registry.ordered('review_container', CONTAINERS, catch_all=[ANCESTOR, MAIN]) == [
+        M6QERB, FEED, ANCESTOR, MAIN]
+
+
+def test_catch_all_stays_last_however_often_it_hits(tmp_path):
+    registry = _registry(tmp_path)
+    registry.record('review_container', FEED, False)
+    for _ in range(20):
+        registry.record('review_container', ANCESTOR, True)
+
+    assert registry.ordered('review_container', CONTAINERS, catch_all=[ANCESTOR, MAIN]) == [
+        M6QERB, FEED, ANCESTOR, MAIN]
+
+
+def test_exploration_keeps_the_given_order(tmp_path):
+    registry = _registry(tmp_path, explore_rate=1.0)
+    registry.record('review_container', M6QERB, True)
+    registry.record('review_container', FEED, False)
+
+    assert registry.ordered('review_container', CONTAINERS, catch_all=[ANCESTOR, MAIN]) == [
+        FEED, M6QERB, ANCESTOR, MAIN]
+
+
+def test_old_outcomes_fade(tmp_path):
+    registry = _registry(tmp_path, decay=0.5)
+    for _ in range(10):
+        registry.record('text', 'span.wiI7pd', False)
+    registry.record('text', '.MyEned', True)
+    assert registry.ordered('text', ['span.wiI7pd', '.MyEned']) == ['.MyEned', 'span.wiI7pd']
+
+    # A few recent hits outweigh a long run of old misses
+    for _ in range(3):
+        registry.record('text', 'span.wiI7pd', True)
+    assert registry.ordered('text', ['span.wiI7pd', '.MyEned']) == ['span.wiI7pd', '.MyEned']
+
+
+def test_stats_survive_a_restart(tmp_path):
+    registry = _registry(tmp_path)
+    registry.record('date', '.rsqaWe', True, tries=4, hits=3)
+    registry.save()
+
+    assert json.loads((tmp_path / "selector_stats.json").read_text())['date']['.rsqaWe'] == {'hits': 3, 'tries': 4}
+    assert _registry(tmp_path).stats == registry.stats